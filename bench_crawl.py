@@ -0,0 +1,175 @@
+"""爬虫吞吐基准测试
+
+在当前进程里用 werkzeug 的 WSGI 服务器启动 server_web.app (数据规模可配置),
+再为每个 http 爬取目标 (见 crawl.targets) 启动一个独立子进程运行 crawl_website
+(限速和随机抖动关闭, 不使用缓存和检查点),
+报告 页面/s、条目/s、抓取延迟 p50/p99、解析耗时和峰值内存.
+每个爬虫在独立子进程里运行, 峰值内存互不影响.
+
+用法: python bench_crawl.py --products 3000 --news 2000 --users 500
+也可以用 --url 对已经启动的站点 (例如多进程的 serve.py) 进行测试, 此时数据规模由该站点决定:
+    python serve.py --products 3000 --news 2000 --users 500 &
+    python bench_crawl.py --url http://127.0.0.1:5000
+默认走 JSON 接口 (站点有接口时列表页和详情都不解析 HTML); 加 --no-api 测试解析 HTML 列表页
+和并发抓详情页的路径, 两种方式的吞吐差别很大, 比较结果时注意用同一种方式.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+TARGETS = ("spider", "user-agent", "anti")
+NO_LIMIT = 1e6  # 基准测试时的限速 (每秒请求数), 相当于不限速
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def timed_call(func, *args):
+    """在解析进程里执行 func, 同时返回消耗的 CPU 时间"""
+    start = time.process_time()
+    result = func(*args)
+    return result, time.process_time() - start
+
+
+def run_target(target, base_url, options):
+    """子进程: 运行一个爬取目标并把统计结果以 JSON 打印到最后一行"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from crawl import core as module
+
+    latencies = []
+    parse_seconds = [0.0]
+
+    class TimedFetchEngine(module.FetchEngine):
+        async def fetch(self, url, *args, **kwargs):
+            result = await super().fetch(url, *args, **kwargs)
+            latencies.append(result.elapsed)
+            return result
+
+    class TimedParsePool(module.ParsePool):
+        async def run(self, func, *args):
+            result, spent = await super().run(timed_call, func, *args)
+            parse_seconds[0] += spent
+            return result
+
+    module.FetchEngine = TimedFetchEngine
+    module.ParsePool = TimedParsePool
+
+    start = time.perf_counter()
+    # anti 目标的随机抖动在基准测试时关闭
+    module.crawl_website(target, base_url=base_url, rate=NO_LIMIT, jitter=0, cache_dir=None,
+                         checkpoint_path=None, **options)
+    elapsed = time.perf_counter() - start
+
+    items = 0
+    for name in os.listdir("."):
+        if name.endswith(".ndjson"):
+            with open(name, encoding="utf-8") as f:
+                items += sum(1 for _ in f)
+    # ru_maxrss 在 Linux 上单位是 KB; 解析进程单独统计
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({
+        "target": target,
+        "seconds": elapsed,
+        "pages": len(latencies),
+        "items": items,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+        "parse_seconds": parse_seconds[0],
+        "peak_rss_mb": peak_kb / 1024,
+    }))
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """不输出每个请求的访问日志"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def start_server(products, news, users, seed=None, store=None):
+    """在后台线程里启动测试站点, 返回 (服务器, 地址)"""
+    import server_web
+    server_web.db = server_web.Database(products=products, news=news, users=users,
+                                        seed=seed, store=store)
+    server = make_server("127.0.0.1", 0, server_web.app, threaded=True,
+                         request_handler=QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫吞吐基准测试")
+    parser.add_argument("--products", type=int, default=30)
+    parser.add_argument("--news", type=int, default=20)
+    parser.add_argument("--users", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=None, help="固定随机种子, 数据可复现")
+    parser.add_argument("--store", default=None, help="把数据保存在 SQLite 文件中按需读取")
+    parser.add_argument("--url", default=None, help="测试已经启动的站点, 不在本进程内启动")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=TARGETS)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--parser", default=None, help="解析后端: html.parser / lxml / selectolax")
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--http2", action="store_true", help="通过 httpx 使用 HTTP/2")
+    parser.add_argument("--no-api", action="store_true",
+                        help="不使用 JSON 接口, 测试解析 HTML 页面和抓详情页的路径")
+    parser.add_argument("--child", nargs=2, metavar=("TARGET", "BASE_URL"), help=argparse.SUPPRESS)
+    parser.add_argument("--options", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_target(*args.child, json.loads(args.options))
+        return
+
+    options = {"concurrency": args.concurrency, "parse_workers": args.parse_workers}
+    if args.parser:
+        options["parser_backend"] = args.parser
+    if args.http2:
+        options["http2"] = True
+    if args.no_api:
+        options["use_api"] = False
+
+    if args.url:
+        server, base_url = None, args.url.rstrip("/")
+        print(f"测试站点 {base_url}")
+    else:
+        server, base_url = start_server(args.products, args.news, args.users,
+                                        args.seed, args.store)
+        print(f"测试站点 {base_url}: 产品 {args.products}, 新闻 {args.news}, 用户 {args.users}")
+    print("抓取方式: " + ("HTML 页面 + 详情页" if args.no_api else "JSON 接口 (没有接口时退回 HTML)"))
+    print(f"{'爬虫':20s} {'耗时s':>7s} {'页面':>6s} {'页面/s':>8s} {'条目/s':>8s} "
+          f"{'p50 ms':>7s} {'p99 ms':>7s} {'解析s':>7s} {'内存MB':>7s}")
+    try:
+        for target in args.targets:
+            with tempfile.TemporaryDirectory() as workdir:
+                proc = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", target, base_url,
+                     "--options", json.dumps(options)],
+                    cwd=workdir, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{target} 运行失败:\n{proc.stderr}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{target:20s} {r['seconds']:7.2f} {r['pages']:6d} "
+                  f"{r['pages'] / r['seconds']:8.1f} {r['items'] / r['seconds']:8.1f} "
+                  f"{r['p50'] * 1000:7.1f} {r['p99'] * 1000:7.1f} "
+                  f"{r['parse_seconds']:7.2f} {r['peak_rss_mb']:7.1f}")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""解析后端基准测试
+
+用 server_web 的测试客户端渲染真实页面 (不需要启动服务器),
+先检查每个后端的提取结果与 html.parser 完全一致, 再比较解析+提取耗时.
+
+用法: python bench_parsers.py [重复次数]
+"""
+import sys
+import time
+
+from crawl.extraction import parse_user_table
+from crawl.parser_backends import DEFAULT_PARSER, PARSER_BACKENDS, get_backend
+from crawl.schemas import (NEWS, NEWS_DETAIL, PRODUCT, PRODUCT_DETAIL, USER_DETAIL,
+                           compile_schema, extract_record, extract_records)
+from server_web import app
+
+BASE_URL = "http://127.0.0.1:5000"
+SCHEMAS = {name: compile_schema(schema, BASE_URL)
+           for name, schema in (("products", PRODUCT), ("news", NEWS), ("user", USER_DETAIL),
+                                ("product", PRODUCT_DETAIL), ("article", NEWS_DETAIL))}
+DETAIL_PAGES = ("user", "product", "article")
+
+
+def load_pages():
+    """渲染基准用的页面: 产品/新闻列表各前 3 页, 用户列表, 以及用户/产品/新闻各几个详情页"""
+    client = app.test_client()
+    pages = []
+    for page in range(1, 4):
+        pages.append(("products", client.get(f"/products?page={page}").get_data(as_text=True)))
+        pages.append(("news", client.get(f"/news?page={page}").get_data(as_text=True)))
+    pages.append(("users", client.get("/users").get_data(as_text=True)))
+    for record_id in range(1, 4):
+        pages.append(("user", client.get(f"/user/{record_id}").get_data(as_text=True)))
+        pages.append(("product", client.get(f"/product/{record_id}").get_data(as_text=True)))
+        pages.append(("article", client.get(f"/news/{record_id}").get_data(as_text=True)))
+    return pages
+
+
+def parse_page(kind, html, backend):
+    if kind == "users":
+        return parse_user_table(html, BASE_URL, backend)
+    if kind in DETAIL_PAGES:
+        return extract_record(html, SCHEMAS[kind], backend)
+    return extract_records(html, SCHEMAS[kind], backend)
+
+
+def available_backends():
+    backends = []
+    for name in PARSER_BACKENDS:
+        try:
+            get_backend(name)
+        except RuntimeError as e:
+            print(f"跳过 {name}: {e}")
+        else:
+            backends.append(name)
+    return backends
+
+
+def main(repeat=50):
+    pages = load_pages()
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in pages)
+    print(f"{len(pages)} 个页面, 共 {total_bytes / 1024:.1f} KB, 每个后端重复 {repeat} 次")
+
+    backends = available_backends()
+    expected = [parse_page(kind, html, DEFAULT_PARSER) for kind, html in pages]
+    for name in backends:
+        results = [parse_page(kind, html, name) for kind, html in pages]
+        if results != expected:
+            for (kind, _), got, want in zip(pages, results, expected):
+                if got != want:
+                    print(f"{name} 在 {kind} 页面上的结果与 {DEFAULT_PARSER} 不一致:\n{got}\n{want}")
+                    break
+            sys.exit(1)
+    print("各后端提取结果一致")
+
+    baseline = None
+    for name in backends:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for kind, html in pages:
+                parse_page(kind, html, name)
+        elapsed = time.perf_counter() - start
+        per_page = elapsed / (repeat * len(pages)) * 1000
+        baseline = baseline or elapsed
+        print(f"{name:12s} {elapsed:7.3f}s  {per_page:6.3f} ms/页  "
+              f"{repeat * total_bytes / elapsed / 1024 / 1024:7.1f} MB/s  x{baseline / elapsed:.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,85 @@
+"""浏览器渲染配置基准测试
+
+用 crawl.chrome.init_driver 为每个渲染配置 (见 rendering.RENDER_PROFILES) 启动一个 Chrome,
+依次渲染同一组页面, 报告 渲染耗时、浏览器 CPU 时间、传输字节数和被拦截的请求数,
+并给出每个配置相对 "full" (不拦截) 节省的流量和时间.
+
+用法: python bench_render.py --url http://127.0.0.1:5000 --profiles full data minimal
+需要 selenium 和 Chrome/chromedriver (与 crawl --target chrome 相同).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from crawl.rendering import RENDER_PROFILES, page_traffic, render
+
+PATHS = ["/", "/products?page=1", "/products?page=2", "/news?page=1", "/users?page=1"]
+
+
+def browser_cpu_seconds(driver):
+    """浏览器进程 (含子进程) 消耗的 CPU 时间, 取不到时返回 None"""
+    try:
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    except Exception:
+        return None
+    values = {m["name"]: m["value"] for m in metrics}
+    return values.get("TaskDuration")
+
+
+def run_profile(init_driver, profile, urls, repeat):
+    """用一个配置渲染全部页面 repeat 次, 返回汇总结果"""
+    driver = init_driver(render_profile=profile)
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        render(driver, urls[0])  # 预热: 第一次打开页面的启动开销不计入
+        page_traffic(driver)
+        cpu_start = browser_cpu_seconds(driver)
+        total = {"pages": 0, "seconds": 0.0, "bytes": 0, "requests": 0, "blocked": 0}
+        for _ in range(repeat):
+            for url in urls:
+                status = render(driver, url)
+                traffic = page_traffic(driver) or {}
+                total["pages"] += 1
+                total["seconds"] += status["elapsed"]
+                for key in ("bytes", "requests", "blocked"):
+                    total[key] += traffic.get(key, 0)
+        cpu_end = browser_cpu_seconds(driver)
+        total["cpu"] = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+        return total
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器渲染配置基准测试")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="已经启动的测试站点")
+    parser.add_argument("--paths", nargs="+", default=PATHS)
+    parser.add_argument("--profiles", nargs="+", default=list(RENDER_PROFILES),
+                        choices=list(RENDER_PROFILES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from crawl.chrome import init_driver
+    base_url = args.url.rstrip("/")
+    urls = [base_url + path for path in args.paths]
+    profiles = args.profiles if "full" in args.profiles else ["full"] + args.profiles
+
+    results = {profile: run_profile(init_driver, profile, urls, args.repeat)
+               for profile in profiles}
+    base = results["full"]
+    print(f"{'配置':10s} {'页面':>5s} {'ms/页':>8s} {'CPU ms/页':>10s} {'KB/页':>8s} "
+          f"{'请求/页':>8s} {'拦截/页':>8s} {'节省流量':>9s} {'节省时间':>9s}")
+    for profile, r in results.items():
+        pages = r["pages"]
+        cpu = f"{r['cpu'] / pages * 1000:10.1f}" if r["cpu"] is not None else f"{'-':>10s}"
+        saved_bytes = 1 - r["bytes"] / base["bytes"] if base["bytes"] else 0.0
+        saved_time = 1 - r["seconds"] / base["seconds"] if base["seconds"] else 0.0
+        print(f"{profile:10s} {pages:5d} {r['seconds'] / pages * 1000:8.1f} {cpu} "
+              f"{r['bytes'] / pages / 1024:8.1f} {r['requests'] / pages:8.1f} "
+              f"{r['blocked'] / pages:8.1f} {saved_bytes:9.1%} {saved_time:9.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""pytest 从仓库根目录导入 crawl 包 (根目录有 conftest.py 时 pytest 会把它加入 sys.path)"""
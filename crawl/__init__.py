@@ -0,0 +1,36 @@
+"""测试站点爬虫
+
+一个命令行入口取代原来的 spider.py / crawler-User-Agent.py / anti_anti_crawler.py /
+bypass-js-spider.py / chromedriver-test.py, 爬取方式由 --target 选择 (见 targets):
+    python -m crawl --target spider --concurrency 20 --parser lxml --sink ndjson
+    python -m crawl --target anti --base-url http://127.0.0.1:5000
+    python -m crawl --target stealth --urls http://127.0.0.1:5000/products
+在代码里使用:
+    import crawl
+    crawl.crawl_website("user-agent", concurrency=10)
+
+抓取引擎、解析、输出、检查点等模块都在本包内 (crawl.fetch_engine, crawl.sinks, ...), 不依赖仓库里的其他文件.
+依赖按需导入: import crawl 本身不导入任何第三方库; HTTP 目标不会导入 selenium /
+undetected_chromedriver, fake_useragent 只在 anti 目标第一次生成请求头时导入.
+"""
+import importlib
+
+# 公开的名字 -> 所在的子模块, 第一次访问时才导入
+_EXPORTS = {
+    "crawl_website": "crawl.core",
+    "crawl_website_async": "crawl.core",
+    "Crawler": "crawl.core",
+    "TARGETS": "crawl.targets",
+    "get_target": "crawl.targets",
+    "main": "crawl.cli",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
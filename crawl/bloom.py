@@ -0,0 +1,172 @@
+"""布隆过滤器: 已抓取地址的紧凑集合
+
+BloomFilter 按预计条数和误判率分配位数组, 每个地址只占十几到几十个二进制位,
+百万级地址只需几 MB (同样数量的 Python 字符串集合要上百 MB). 判断 "见过" 时有
+error_rate 的概率误判 (把没见过的地址当成见过), 判断 "没见过" 时一定准确.
+
+ScalableBloomFilter 不需要事先知道总条数: 当前过滤器装满后追加一个容量翻倍、误判率减半的
+新过滤器, 总误判率不超过 error_rate.
+
+两者都可以 save 到文件, 之后 load 继续使用:
+    seen = ScalableBloomFilter()
+    seen.add(url); url in seen
+    seen.save("seen.bloom"); seen = ScalableBloomFilter.load("seen.bloom")
+"""
+import hashlib
+import math
+import os
+import struct
+
+DEFAULT_CAPACITY = 100000
+DEFAULT_ERROR_RATE = 1e-7
+GROWTH = 2           # 追加的过滤器容量是上一个的几倍
+TIGHTENING = 0.5     # 追加的过滤器误判率是上一个的几倍
+
+_MAGIC = b"BLOOM1\n"
+_HEADER = struct.Struct("<QdQQQ")  # capacity, error_rate, num_bits, num_hashes, count
+
+
+def _hashes(key):
+    """由一次 blake2b 得到两个 64 位哈希, 第 i 个位置取 h1 + i * h2 (双重哈希)"""
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """固定容量的布隆过滤器, 装入 capacity 条时误判率约为 error_rate"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity 必须为正数, error_rate 必须在 0 和 1 之间")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # 最优位数 m = -n ln p / (ln 2)^2, 哈希个数 k = m / n * ln 2
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hashes):
+        h1, h2 = hashes
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def _add(self, hashes):
+        bits = self.bits
+        present = True
+        for pos in self._positions(hashes):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def _contains(self, hashes):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hashes))
+
+    def add(self, key):
+        """加入 key, 返回加入前是否 (可能) 已经存在"""
+        return self._add(_hashes(key))
+
+    def __contains__(self, key):
+        return self._contains(_hashes(key))
+
+    def __len__(self):
+        """已加入的 (不重复的) 条数, 误判的重复不计入"""
+        return self.count
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def _write(self, f):
+        f.write(_HEADER.pack(self.capacity, self.error_rate, self.num_bits, self.num_hashes,
+                             self.count))
+        f.write(self.bits)
+
+    @classmethod
+    def _read(cls, f):
+        capacity, error_rate, num_bits, num_hashes, count = _HEADER.unpack(f.read(_HEADER.size))
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.error_rate = capacity, error_rate
+        bloom.num_bits, bloom.num_hashes, bloom.count = num_bits, num_hashes, count
+        bloom.bits = bytearray(f.read((num_bits + 7) // 8))
+        return bloom
+
+    def save(self, path):
+        _save(path, [self])
+
+    @classmethod
+    def load(cls, path):
+        filters = _load(path)
+        if len(filters) != 1:
+            raise ValueError(f"{path} 保存的是可扩展布隆过滤器")
+        return filters[0]
+
+
+class ScalableBloomFilter:
+    """容量不够时自动追加过滤器的布隆过滤器"""
+
+    def __init__(self, initial_capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        # 各级误判率按 TIGHTENING 递减, 总和不超过 error_rate
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(initial_capacity, error_rate * (1 - TIGHTENING))]
+
+    def add(self, key):
+        """加入 key, 返回加入前是否 (可能) 已经存在"""
+        hashes = _hashes(key)
+        if any(bloom._contains(hashes) for bloom in reversed(self.filters)):
+            return True
+        current = self.filters[-1]
+        if current.full:
+            current = BloomFilter(current.capacity * GROWTH, current.error_rate * TIGHTENING)
+            self.filters.append(current)
+        current._add(hashes)
+        return False
+
+    def __contains__(self, key):
+        hashes = _hashes(key)
+        return any(bloom._contains(hashes) for bloom in reversed(self.filters))
+
+    def __len__(self):
+        return sum(len(bloom) for bloom in self.filters)
+
+    @property
+    def nbytes(self):
+        """位数组占用的字节数"""
+        return sum(len(bloom.bits) for bloom in self.filters)
+
+    def save(self, path):
+        _save(path, self.filters)
+
+    @classmethod
+    def load(cls, path):
+        filters = _load(path)
+        bloom = cls.__new__(cls)
+        bloom.filters = filters
+        bloom.error_rate = filters[0].error_rate / (1 - TIGHTENING)
+        return bloom
+
+
+def _save(path, filters):
+    # 先写临时文件再替换, 中途中断不会留下损坏的文件
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(filters)))
+        for bloom in filters:
+            bloom._write(f)
+    os.replace(tmp, path)
+
+
+def _load(path):
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} 不是布隆过滤器文件")
+        (n,) = struct.unpack("<I", f.read(4))
+        return [BloomFilter._read(f) for _ in range(n)]
@@ -0,0 +1,163 @@
+"""浏览器池: 复用预热好的无头浏览器会话
+
+每个会话启动一次浏览器 (Chrome 启动要几秒), 之后连续处理多个页面:
+    - 池的大小固定, crawl_many 用同样数量的线程并行处理页面
+    - 每个会话有自己的调试端口和用户目录, 多个浏览器可以同时运行
+    - 取出会话时做健康检查, 浏览器已经崩溃或卡死时换一个新的
+    - 每个会话处理 max_pages 个页面后关闭重开, 避免浏览器内存越涨越高
+
+factory(port, profile_dir) 负责创建 WebDriver (见 crawl.chrome.init_driver 和
+crawl.stealth.AntiDetectCrawler), 应当把两个参数分别传给
+--remote-debugging-port 和 --user-data-dir.
+
+用法:
+    with BrowserPool(init_driver, size=4) as pool:
+        results = pool.crawl_many(urls, handler)   # handler(driver, url) -> 结果
+"""
+import logging
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_PAGES = 100   # 每个会话处理多少个页面后重启浏览器
+HEALTH_CHECK_TIMEOUT = 5  # 健康检查时脚本执行的超时秒数
+
+
+def free_port():
+    """向系统要一个当前空闲的端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class BrowserSession:
+    """池中的一个浏览器会话"""
+
+    def __init__(self, factory, index):
+        self.index = index
+        self.port = free_port()
+        self.profile_dir = tempfile.mkdtemp(prefix=f"browser-pool-{index}-")
+        self.pages = 0
+        self.started = time.time()
+        try:
+            self.driver = factory(self.port, self.profile_dir)
+        except Exception:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            raise
+
+    def healthy(self):
+        """浏览器进程还在并且能执行脚本"""
+        try:
+            self.driver.set_script_timeout(HEALTH_CHECK_TIMEOUT)
+            return self.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logger.warning(f"浏览器会话 {self.index} 健康检查失败: {e}")
+            return False
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"关闭浏览器会话 {self.index} 失败: {e}")
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    """固定大小的浏览器会话池, 会话在第一次用到时才启动"""
+
+    def __init__(self, factory, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()  # 后进先出: 优先复用刚用过的会话
+        self._slots = threading.BoundedSemaphore(size)
+        # 同时启动多个浏览器 (尤其是 undetected_chromedriver 修补驱动文件时) 容易冲突, 逐个启动
+        self._start_lock = threading.Lock()
+        self._count = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self):
+        with self._start_lock:
+            self._count += 1
+            session = BrowserSession(self.factory, self._count)
+        logger.info(f"浏览器会话 {session.index} 已启动 (调试端口 {session.port})")
+        return session
+
+    def _discard(self, session):
+        session.close()
+
+    def _checkout(self):
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            return self._start()
+        if session.healthy():
+            return session
+        self._discard(session)
+        return self._start()
+
+    def _checkin(self, session):
+        if self._closed:
+            self._discard(session)
+        elif session.pages >= self.max_pages:
+            logger.info(f"浏览器会话 {session.index} 已处理 {session.pages} 个页面, 重启")
+            self._discard(session)
+        else:
+            self._idle.put(session)
+
+    @contextmanager
+    def session(self):
+        """取出一个健康的会话, 用完放回 (页面处理出错不影响会话复用, 下次取出时会做健康检查)"""
+        if self._closed:
+            raise RuntimeError("浏览器池已关闭")
+        self._slots.acquire()
+        try:
+            session = self._checkout()
+            try:
+                yield session
+            finally:
+                session.pages += 1
+                self._checkin(session)
+        finally:
+            self._slots.release()
+
+    def run(self, url, handler):
+        """用池中的一个会话处理一个页面, 返回 handler(driver, url) 的结果"""
+        with self.session() as session:
+            return handler(session.driver, url)
+
+    def crawl_many(self, urls, handler):
+        """并行处理多个页面, 按输入顺序返回结果; 处理失败的页面结果为 None"""
+        def crawl(url):
+            try:
+                return self.run(url, handler)
+            except Exception as e:
+                logger.error(f"页面爬取失败: {url}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(crawl, urls))
+
+    def close(self):
+        """关闭全部浏览器 (正在使用的会话在放回时关闭)"""
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(session)
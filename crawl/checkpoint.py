@@ -0,0 +1,118 @@
+"""可恢复的爬取检查点
+
+用 SQLite 记录每个数据集 (列表路径) 的待抓取页面 (frontier)、已完成页面以及每页产出的记录.
+中断后重新运行时: 已完成页面的记录直接从检查点重放到输出, 不再抓取;
+只抓取尚未完成的页面, 因此输出既不缺失也不重复.
+整个爬取成功结束且没有未完成页面时, 检查点文件被删除.
+"""
+import json
+import os
+import sqlite3
+
+DEFAULT_CHECKPOINT = "crawl_checkpoint.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY,
+    total INTEGER
+);
+CREATE TABLE IF NOT EXISTS pages (
+    dataset TEXT NOT NULL,
+    url TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dataset, url)
+);
+CREATE TABLE IF NOT EXISTS records (
+    dataset TEXT NOT NULL,
+    url TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_page ON records (dataset, url);
+"""
+
+
+class Checkpoint:
+    """SQLite 检查点, 每完成一页提交一次事务"""
+
+    def __init__(self, path=DEFAULT_CHECKPOINT):
+        self.path = path
+        self.resumed = os.path.exists(path)
+        if self.resumed:
+            print(f"发现检查点 {path}, 从上次中断处继续")
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def total(self, dataset):
+        """上次记录的总页数, 未知返回 None"""
+        row = self.conn.execute("SELECT total FROM datasets WHERE name = ?", (dataset,)).fetchone()
+        return row[0] if row else None
+
+    def set_total(self, dataset, total):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO datasets (name, total) VALUES (?, ?)",
+                              (dataset, total))
+
+    def plan(self, dataset, urls):
+        """把页面加入待抓取队列 (已存在的忽略), seq 按加入顺序递增"""
+        with self.conn:
+            (seq,) = self.conn.execute("SELECT COUNT(*) FROM pages WHERE dataset = ?",
+                                       (dataset,)).fetchone()
+            for url in urls:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO pages (dataset, url, seq) VALUES (?, ?, ?)",
+                    (dataset, url, seq))
+                seq += cursor.rowcount
+
+    def started(self, dataset):
+        """该数据集是否已经有页面记入检查点"""
+        row = self.conn.execute("SELECT 1 FROM pages WHERE dataset = ? LIMIT 1", (dataset,)).fetchone()
+        return row is not None
+
+    def is_done(self, dataset, url):
+        row = self.conn.execute("SELECT done FROM pages WHERE dataset = ? AND url = ?",
+                                (dataset, url)).fetchone()
+        return bool(row and row[0])
+
+    def next_pending(self, dataset):
+        """最早加入且尚未完成的页面, 没有则返回 None"""
+        row = self.conn.execute(
+            "SELECT url FROM pages WHERE dataset = ? AND done = 0 ORDER BY seq LIMIT 1",
+            (dataset,)).fetchone()
+        return row[0] if row else None
+
+    def complete(self, dataset, url, records):
+        """在一个事务里保存页面记录并标记完成"""
+        with self.conn:
+            self.conn.execute("DELETE FROM records WHERE dataset = ? AND url = ?", (dataset, url))
+            self.conn.executemany(
+                "INSERT INTO records (dataset, url, data) VALUES (?, ?, ?)",
+                ((dataset, url, json.dumps(r, ensure_ascii=False)) for r in records))
+            self.conn.execute(
+                "INSERT INTO pages (dataset, url, seq, done) VALUES (?, ?, "
+                "(SELECT COUNT(*) FROM pages WHERE dataset = ?), 1) "
+                "ON CONFLICT (dataset, url) DO UPDATE SET done = 1",
+                (dataset, url, dataset))
+
+    def replay(self, dataset):
+        """按页面顺序逐页产出已完成页面的记录"""
+        pages = self.conn.execute(
+            "SELECT url FROM pages WHERE dataset = ? AND done = 1 ORDER BY seq",
+            (dataset,)).fetchall()
+        for (url,) in pages:
+            rows = self.conn.execute(
+                "SELECT data FROM records WHERE dataset = ? AND url = ? ORDER BY rowid",
+                (dataset, url))
+            yield [json.loads(data) for (data,) in rows]
+
+    def has_pending(self):
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM pages WHERE done = 0").fetchone()
+        return count > 0
+
+    def close(self, success=True):
+        """关闭检查点; 爬取成功且没有未完成页面时删除检查点文件"""
+        remove = success and not self.has_pending()
+        self.conn.close()
+        if remove:
+            os.remove(self.path)
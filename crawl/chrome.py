@@ -0,0 +1,76 @@
+"""Chrome 浏览器池: 用 selenium 渲染页面并统计产品数量 (目标 chrome)"""
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+import logging
+
+from crawl.browser_pool import BrowserPool
+from crawl.rendering import (apply_profile, apply_profile_options, install_request_tracker,
+                             page_traffic, render)
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 4  # 同时运行的浏览器数
+READY_SELECTOR = ".content"  # 页面主体出现且 DOM/网络安静后即认为渲染完成
+RENDER_PROFILE = "data"  # 只抓数据: 不加载图片/字体/音视频和统计脚本 (见 rendering.RENDER_PROFILES)
+
+def init_driver(port=None, profile_dir=None, render_profile=None):
+    """创建 Chrome; 浏览器池为每个会话分配独立的调试端口和用户目录, 多个实例可以同时运行
+    render_profile 为 None 时使用 RENDER_PROFILE"""
+    render_profile = render_profile or RENDER_PROFILE
+    try:
+        chrome_options = Options()
+        
+        # CentOS专用配置
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")  # CentOS必须
+        chrome_options.add_argument("--disable-dev-shm-usage")  # Docker/小内存环境必须
+        chrome_options.add_argument("--disable-gpu")
+        if port:
+            chrome_options.add_argument(f"--remote-debugging-port={port}")
+        if profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        # DOMContentLoaded 后 get 就返回, 之后按就绪信号等待 (见 rendering)
+        chrome_options.page_load_strategy = "eager"
+        apply_profile_options(chrome_options, render_profile)
+        
+        # 指定chromedriver路径
+        service = Service('/usr/local/bin/chromedriver')
+        
+        driver = webdriver.Chrome(
+            service=service,
+            options=chrome_options
+        )
+        install_request_tracker(driver)
+        apply_profile(driver, render_profile)
+        logger.info(f"ChromeDriver初始化成功 (渲染配置 {render_profile})")
+        return driver
+    except Exception as e:
+        logger.error(f"浏览器初始化失败: {str(e)}")
+        raise
+
+def crawl_page(driver, url):
+    """在池中的浏览器里打开一个页面并统计产品数量"""
+    logger.info(f"正在访问: {url}")
+    # 等到页面就绪 (而不是固定睡眠), 最多 RENDER_BUDGET 秒
+    status = render(driver, url, selector=READY_SELECTOR)
+    
+    # 示例：统计产品数量
+    products = driver.find_elements("css selector", ".product")
+    traffic = page_traffic(driver) or {}
+    logger.info(f"{driver.title} ({driver.current_url}): 找到 {len(products)} 个产品, "
+                f"渲染耗时 {status['elapsed']:.2f}s, 传输 {traffic.get('bytes', 0)} 字节, "
+                f"拦截 {traffic.get('blocked', 0)} 个请求")
+    return {"url": driver.current_url, "title": driver.title, "products": len(products),
+            "render_seconds": status["elapsed"], "ready": status["ready"], "traffic": traffic}
+
+def crawl_data(urls, pool_size=POOL_SIZE):
+    """用浏览器池并行渲染多个页面, 浏览器只启动 pool_size 次"""
+    try:
+        with BrowserPool(init_driver, size=pool_size) as pool:
+            results = pool.crawl_many(urls, crawl_page)
+        logger.info("浏览器已关闭")
+        return results
+    except Exception as e:
+        logger.error(f"爬取过程中出错: {str(e)}")
+        return []
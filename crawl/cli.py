@@ -0,0 +1,110 @@
+"""命令行入口: python -m crawl --target spider --concurrency 20 --parser lxml --sink ndjson
+
+--list 列出全部目标. http 目标爬取产品、新闻、用户三个栏目 (见 core),
+browser 目标用浏览器池渲染 --urls 给出的页面 (默认为目标配置的 paths), 结果写入 pages 输出文件.
+只在确定目标之后才导入对应的模块, --help / --list 不会导入 aiohttp 或 selenium.
+"""
+import argparse
+import logging
+
+from crawl.parser_backends import DEFAULT_PARSER, PARSER_BACKENDS
+from crawl.sinks import DEFAULT_SINK, SINK_FORMATS
+from crawl.targets import BASE_URL, TARGETS, get_target, load
+
+DEFAULT_POOL_SIZE = 4
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="crawl", description="爬取测试站点数据")
+    parser.add_argument("--target", default="spider", choices=list(TARGETS),
+                        help="爬取方式 (默认 spider, --list 查看说明)")
+    parser.add_argument("--list", action="store_true", help="列出全部目标后退出")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--sink", default=DEFAULT_SINK, choices=SINK_FORMATS, help="输出格式")
+
+    http = parser.add_argument_group("http 目标")
+    http.add_argument("--concurrency", type=int, default=None, help="全局并发上限 (默认取目标配置)")
+    http.add_argument("--per-host", type=int, default=None, help="单主机并发上限")
+    http.add_argument("--rate", type=float, default=None, help="每个主机每秒请求数的起点")
+    http.add_argument("--parser", default=DEFAULT_PARSER, choices=PARSER_BACKENDS,
+                      help="解析后端")
+    http.add_argument("--parse-workers", type=int, default=None,
+                      help="解析进程数, 默认 CPU 核数, 0 表示不用子进程")
+    http.add_argument("--no-api", action="store_true", help="不使用 JSON 接口, 只解析 HTML 页面")
+    http.add_argument("--http2", action="store_true", help="通过 httpx 使用 HTTP/2")
+    http.add_argument("--browser", action="store_true",
+                      help="需要 JS 渲染的页面交给浏览器池 (见 hybrid)")
+    http.add_argument("--incremental", action="store_true", help="增量模式, 额外输出 *.delta.json")
+    http.add_argument("--cache-dir", default=None, help="条件请求缓存目录")
+    http.add_argument("--no-cache", action="store_true", help="不使用条件请求缓存")
+    http.add_argument("--checkpoint", default=None, help="检查点文件")
+    http.add_argument("--no-checkpoint", action="store_true", help="不记录检查点")
+
+    browser = parser.add_argument_group("browser 目标")
+    browser.add_argument("--urls", nargs="+", default=None, help="要渲染的页面")
+    browser.add_argument("--pool-size", type=int, default=None,
+                         help=f"同时运行的浏览器数 (默认 {DEFAULT_POOL_SIZE})")
+    return parser
+
+
+def crawl_http(target, args):
+    # 到这里才导入 aiohttp / 解析后端等依赖
+    from crawl.core import crawl_website
+
+    options = {
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "per_host": args.per_host,
+        "rate": args.rate,
+        "sink": args.sink,
+        "parse_workers": args.parse_workers,
+        "parser_backend": args.parser,
+        "use_api": not args.no_api,
+        "http2": args.http2,
+        "browser": args.browser,
+        "incremental": args.incremental,
+    }
+    if args.no_cache:
+        options["cache_dir"] = None
+    elif args.cache_dir:
+        options["cache_dir"] = args.cache_dir
+    if args.no_checkpoint:
+        options["checkpoint_path"] = None
+    elif args.checkpoint:
+        options["checkpoint_path"] = args.checkpoint
+    crawl_website(target["name"], **options)
+
+
+def crawl_browser(target, args):
+    from crawl.sinks import open_sink
+
+    base_url = args.base_url.rstrip("/")
+    urls = args.urls or [base_url + path for path in target["paths"]]
+    try:
+        crawl = load(target["crawl"])
+    except ImportError as e:
+        raise SystemExit(f"目标 {target['name']} 需要安装 {e.name}: {e}")
+    results = crawl(urls, args.pool_size or DEFAULT_POOL_SIZE)
+    pages = [result for result in results if result]
+    sink = open_sink("pages", args.sink)
+    sink.write_page(pages)
+    sink.close()
+    print(f"成功渲染 {len(pages)}/{len(urls)} 个页面, 已保存到 {sink.path}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list:
+        for name, target in TARGETS.items():
+            print(f"{name:12s} {target['kind']:8s} {target['description']}")
+        return
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+    target = get_target(args.target)
+    if target["kind"] == "browser":
+        crawl_browser(target, args)
+    else:
+        crawl_http(target, args)
@@ -0,0 +1,313 @@
+"""HTTP 爬虫: 按目标配置 (见 targets) 爬取测试站点的产品、新闻、用户三个栏目
+
+三个栏目并发爬取, 每页结果直接写入输出文件; 列表页上发现的详情链接全部进入 frontier 并发抓取.
+优先使用站点的 JSON 接口, 没有接口时解析 HTML 页面.
+
+用法:
+    from crawl.core import crawl_website
+    crawl_website("anti", base_url="http://127.0.0.1:5000", concurrency=10)
+"""
+import asyncio
+import json
+import math
+import random
+from contextlib import nullcontext
+from urllib.parse import urljoin
+
+from crawl.checkpoint import DEFAULT_CHECKPOINT, Checkpoint
+from crawl.extraction import parse_user_table, user_from_record
+from crawl.fetch_engine import FetchEngine, run
+from crawl.frontier import Frontier, fetch_details, iter_with_details
+from crawl.http_cache import DEFAULT_CACHE_DIR, HttpCache
+from crawl.incremental import DEFAULT_STATE_FILE, IncrementalStore, delta_filename
+from crawl.pagination import ApiUnavailable, fetch_api_records, iter_api_pages, iter_pages
+from crawl.parse_pool import ParsePool
+from crawl.parser_backends import DEFAULT_PARSER
+from crawl.rate_limiter import HostRateLimiter
+from crawl.schemas import (NEWS, NEWS_DETAIL, PAGE_ITEMS, PRODUCT, PRODUCT_DETAIL,
+                           USER_DETAIL, compile_schema, extract_record, extract_records)
+from crawl.sinks import DEFAULT_SINK, drain, open_sink
+from crawl.targets import BASE_URL, get_target, load
+
+USER_DETAIL_FIELDS = ("email", "phone", "last_login")  # 只能从详情页获取的字段
+PRODUCT_DETAIL_FIELDS = ("description",)
+NEWS_DETAIL_FIELDS = ("content",)
+# 详情页优先级 (数字小的先抓): 用户列表要等全部详情抓完才能写出, 先抓用户详情
+DETAIL_PRIORITY = {"users": 0, "products": 1, "news": 2}
+
+
+def crawl_website(target="spider", **options):
+    run(crawl_website_async(target, **options))
+
+
+async def crawl_website_async(target="spider", base_url=BASE_URL, concurrency=None,
+                              per_host=None, rate=None, jitter=None,
+                              cache_dir=DEFAULT_CACHE_DIR, incremental=False, sink=DEFAULT_SINK,
+                              checkpoint_path=DEFAULT_CHECKPOINT, parse_workers=None,
+                              parser_backend=DEFAULT_PARSER, use_api=True,
+                              http2=False, browser=False):
+    """爬取全部栏目; concurrency / per_host / rate / jitter 为 None 时使用目标的配置"""
+    crawler = Crawler(target, base_url)
+    config = crawler.target
+    print(f"=== 开始爬取测试网站数据 ({crawler.target['name']}) ===")
+    concurrency = concurrency or config["concurrency"]
+    rate = rate or config["rate"]
+
+    # 增量模式: 只为新增/变化的条目抓详情, 并额外输出 *.delta.json
+    crawler.store = IncrementalStore(DEFAULT_STATE_FILE) if incremental else None
+    # 检查点: 中断后重新运行会从上次停下的地方继续, checkpoint_path 为 None 时不记录
+    checkpoint = crawler.checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    crawler.use_api = use_api
+
+    # 没有配置突发量时取 rate 向上取整, 至少为 1 (rate < 1 时桶里也要能攒满一个令牌)
+    limiter = HostRateLimiter(rate=rate, burst=config["burst"] or max(1, math.ceil(rate)),
+                              jitter=config["jitter"] if jitter is None else jitter)
+    # cache_dir 为 None 时不使用缓存, 每次都完整下载
+    cache = HttpCache(cache_dir) if cache_dir else None
+    # 解析进程数, None 表示 CPU 核数, 0 表示在事件循环线程内直接解析;
+    # parser_backend 选择解析后端: html.parser / lxml / selectolax, 提取结果相同;
+    # use_api 为 True 时优先使用站点的 JSON 接口, 没有接口时解析 HTML 页面;
+    # 连接保持复用 (keep-alive), http2 为 True 时通过 httpx 使用 HTTP/2 多路复用
+    # browser 为 True 时先用普通请求, 页面内容要靠 JS 渲染时才交给浏览器池 (见 hybrid)
+    if browser:
+        from crawl.hybrid import HybridFetcher
+    async with FetchEngine(concurrency=concurrency, per_host=per_host or config["per_host"],
+                           rate_limiter=limiter, cache=cache, http2=http2) as engine, \
+            (HybridFetcher(engine, PAGE_ITEMS, backend=parser_backend) if browser
+             else nullcontext(engine)) as fetcher, \
+            ParsePool(parse_workers, backend=parser_backend) as parser, \
+            Frontier(crawler.crawl_detail, workers=concurrency) as frontier:
+        crawler.engine, crawler.fetcher, crawler.parser = engine, fetcher, parser
+        crawler.frontier = frontier
+        # 首先访问首页, 获取cookies等
+        if config["warmup"] and not await crawler.warmup():
+            if checkpoint is not None:
+                checkpoint.close(success=False)
+            return
+
+        # 产品、新闻、用户三个栏目并发爬取, 每页结果直接写入输出文件;
+        # 发现的详情链接全部进入 frontier, 由工作协程并发抓取
+        store = crawler.store
+        results = await asyncio.gather(
+            # 1. 爬取产品数据
+            save_stream(crawler.crawl_paginated_data("/products", PRODUCT, PRODUCT_DETAIL),
+                        "products", sink, store, key="link", exclude=PRODUCT_DETAIL_FIELDS),
+            # 2. 爬取新闻数据
+            save_stream(crawler.crawl_paginated_data("/news", NEWS, NEWS_DETAIL),
+                        "news", sink, store, key="link", exclude=NEWS_DETAIL_FIELDS),
+            # 3. 爬取用户数据
+            save_stream(crawler.crawl_users(),
+                        "users", sink, store, key="detail_link", exclude=USER_DETAIL_FIELDS),
+        )
+
+    if crawler.store is not None:
+        crawler.store.save()
+    if checkpoint is not None:
+        checkpoint.close(success=all(results))
+
+    print("\n=== 爬取完成 ===" if all(results) else "\n=== 爬取结束, 有栏目未完整爬取 ===")
+
+
+class Crawler:
+    """一次爬取的状态: 目标配置, 以及 crawl_website_async 创建的抓取器、解析池、frontier 等"""
+
+    def __init__(self, target="spider", base_url=BASE_URL):
+        self.target = get_target(target) if isinstance(target, str) else target
+        self.base_url = base_url
+        headers = self.target["headers"]
+        self.headers = load(headers) if isinstance(headers, str) else headers
+        self.engine = self.fetcher = self.parser = self.frontier = None
+        self.store = self.checkpoint = None
+        self.use_api = True
+
+    async def fetch(self, url):
+        """按目标配置加上请求头和代理抓取一个地址; 失败或被拦截时降低该主机的速率后重试"""
+        retries = self.target["retries"]
+        marker = self.target["block_marker"]
+        proxies = self.target["proxies"]
+        for attempt in range(retries):
+            kwargs = {}
+            if self.headers is not None:
+                kwargs["headers"] = self.headers(self.base_url)
+            if proxies:
+                kwargs["proxy"] = random.choice(proxies)
+            try:
+                # 非 2xx/3xx 状态码由引擎抛出
+                response = await self.fetcher.fetch(url, **kwargs)
+                # 检查是否有反爬提示
+                if marker and marker in response.text:
+                    raise Exception("Anti-crawler detected")
+                return response
+            except Exception as e:
+                if retries == 1:
+                    raise
+                print(f"请求失败 (尝试 {attempt + 1}/{retries}): {e}")
+                if attempt == retries - 1:
+                    raise
+                self.engine.rate_limiter.penalize(url)  # 失败后降低该主机的请求速率
+
+    async def warmup(self):
+        print("\n初始化会话...")
+        try:
+            await self.fetch(self.base_url)
+            print("成功建立初始会话")
+            return True
+        except Exception as e:
+            print(f"初始化失败: {e}")
+            return False
+
+    async def crawl_users(self):
+        print("\n=== 爬取用户数据 ===")
+        users_url = urljoin(self.base_url, "/users")
+        checkpoint, store = self.checkpoint, self.store
+        # 用户列表已在检查点中完成时直接重放
+        if checkpoint is not None and checkpoint.is_done("/users", users_url):
+            for page_data in checkpoint.replay("/users"):
+                yield page_data
+            return
+        try:
+            users = await crawl_user_list_api(self.fetch, self.base_url) if self.use_api else None
+            from_api = users is not None
+            if not from_api:
+                response = await self.fetch(users_url)
+                users = await self.parser.run(parse_user_table, response.text, self.base_url,
+                                              self.parser.backend)
+
+            # 爬取全部用户的详情: 有接口时按 ids= 批量获取, 否则详情页进入 frontier 并发抓取
+            pending = [user for user in users
+                       if not reuse_detail(store, "users", user, "detail_link", USER_DETAIL_FIELDS)]
+            detail_schema = compile_schema(USER_DETAIL, self.base_url)
+            if from_api:
+                details = await crawl_user_details_api(self.fetch, self.base_url, pending,
+                                                       detail_schema)
+                for user, user_detail in zip(pending, details):
+                    user.update(user_detail)
+            elif self.frontier is not None:
+                await fetch_details(self.frontier, pending, "detail_link", detail_schema,
+                                    DETAIL_PRIORITY["users"], fields=USER_DETAIL_FIELDS)
+
+            if checkpoint is not None:
+                checkpoint.complete("/users", users_url, users)
+            yield users
+        except Exception as e:
+            print(f"爬取用户数据失败: {e}")
+            raise
+
+    async def crawl_paginated_data(self, base_path, schema, detail_schema=None):
+        print(f"\n=== 开始爬取 {base_path} ===")
+        count = 0
+        checkpoint, store, parser, frontier = self.checkpoint, self.store, self.parser, self.frontier
+
+        api_path = "/api" + base_path
+        # 从检查点恢复: 已完成页面的记录直接重放, 不再抓取
+        if checkpoint is not None:
+            for dataset in (base_path, api_path):
+                for page_data in checkpoint.replay(dataset):
+                    count += len(page_data)
+                    yield page_data
+
+        # 模式每次爬取只编译一次; 正文交给解析进程池, 多个页面并行解析 (编译结果可以 pickle)
+        compiled = compile_schema(schema, self.base_url)
+        async def parse(html):
+            return await parser.run(extract_records, html, compiled, parser.backend)
+        # 详情字段: 接口记录里已经有, HTML 列表页上没有的要抓详情页
+        detail = compile_schema(detail_schema, self.base_url) if detail_schema else None
+        dataset = base_path.strip("/")
+        fields = tuple(detail_schema["fields"]) if detail_schema else ()
+        async def enrich(records):
+            pending = [r for r in records if not reuse_detail(store, dataset, r, "link", fields)]
+            await fetch_details(frontier, pending, "link", detail, DETAIL_PRIORITY[dataset],
+                                fields=fields)
+            return records
+
+        # 优先使用 JSON 接口: 每页几百条且不需要解析 HTML; 站点没有接口时退回到 HTML 页面
+        # (上次中断时已经在抓 HTML 页面的, 继续抓 HTML 页面)
+        if self.use_api and not (checkpoint is not None and checkpoint.started(base_path)):
+            try:
+                async for url, items in iter_api_pages(self.fetch, self.base_url, api_path,
+                                                       checkpoint=checkpoint):
+                    page_data = [compiled.from_json(item) for item in items]
+                    if detail is not None:
+                        for record, item in zip(page_data, items):
+                            record.update(detail.from_json(item))
+                    if checkpoint is not None:
+                        checkpoint.complete(api_path, url, page_data)
+                    count += len(page_data)
+                    yield page_data
+                print(f"已获取 {count} 条数据")
+                return
+            except ApiUnavailable as e:
+                print(f"没有可用的 JSON 接口, 改为解析 HTML 页面: {e}")
+
+        # 第 1 页读出总页数后, 其余页面并发抓取; 每页的详情链接一到就进入 frontier
+        pages = iter_pages(self.fetch, self.base_url, base_path,
+                           max_pages=self.target["max_pages"], checkpoint=checkpoint, parse=parse)
+        if frontier is not None and detail is not None:
+            pages = iter_with_details(pages, enrich)
+        async for url, page_data in pages:
+            if checkpoint is not None:
+                checkpoint.complete(base_path, url, page_data)
+            count += len(page_data)
+            yield page_data
+
+        print(f"已获取 {count} 条数据")
+
+    async def crawl_detail(self, url, schema):
+        """frontier 的处理函数: 抓取一个详情页并按模式提取字段, 失败时抛出异常 (见 fetch_details)"""
+        response = await self.fetch(url)
+        return await self.parser.run(extract_record, response.text, schema, self.parser.backend)
+
+
+async def crawl_user_list_api(fetch, base_url):
+    """通过 JSON 接口获取用户列表, 站点没有接口时返回 None"""
+    try:
+        return [user_from_record(record, base_url)
+                async for _, records in iter_api_pages(fetch, base_url, "/api/users")
+                for record in records]
+    except ApiUnavailable as e:
+        print(f"没有可用的 JSON 接口, 改为解析 HTML 页面: {e}")
+        return None
+
+
+async def crawl_user_details_api(fetch, base_url, users, schema):
+    """通过 ids= 批量接口一次获取多个用户的详情字段, 接口请求失败时抛出异常
+
+    接口没有返回的用户, 详情字段全部为 None (或模式里的默认值).
+    """
+    records = await fetch_api_records(fetch, base_url, "/api/users",
+                                      [user["id"] for user in users])
+    return [schema.from_json(records.get(user["id"], {})) for user in users]
+
+
+def reuse_detail(store, dataset, record, key, fields):
+    """增量模式下, 列表内容没变的条目直接沿用上次的详情字段"""
+    if store is None:
+        return False
+    return store.reuse(dataset, record[key], record, fields, exclude=fields)
+
+
+async def save_stream(pages, name, sink_format, store=None, key=None, exclude=()):
+    """逐页写入输出文件; 增量模式下同时计算与上次的差异"""
+    sink = open_sink(name, sink_format)
+    on_page = None
+    if store is not None:
+        store.begin(name)
+        on_page = lambda records: store.observe(name, records, key, exclude)
+    try:
+        await drain(pages, sink, on_page)
+    except Exception as e:
+        if sink.partial_path:
+            print(f"{name} 未完整爬取, 已写入的页面保留在 {sink.partial_path}: {e}")
+        else:
+            print(f"{name} 未完整爬取, 没有输出文件: {e}")
+        return False
+    print(f"数据已保存到 {sink.path}")
+    if store is not None:
+        save_to_file(store.finish(name), delta_filename(f"{name}.json"))
+    return True
+
+
+def save_to_file(data, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"数据已保存到 {filename}")
@@ -0,0 +1,59 @@
+"""列表项字段提取层
+
+ParsedItem 包装一个已解析的元素: 文本在第一次访问时计算并缓存, 选择器查询结果也只算一次
+(列表项的字段提取见 schemas). 用户表格和 JSON 接口记录的转换也在这里.
+解析函数的 backend 参数选择解析后端 (见 parser_backends), 各后端提取结果相同.
+"""
+from urllib.parse import urljoin
+
+from crawl.parser_backends import get_backend
+
+
+class ParsedItem:
+    """包装一个已解析的元素, 缓存文本和选择器查询结果"""
+
+    __slots__ = ('element', 'backend', '_text', '_selected')
+
+    def __init__(self, element, backend=None):
+        self.element = element
+        self.backend = backend or get_backend()
+        self._text = None
+        self._selected = {}
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.backend.text(self.element)
+        return self._text
+
+    def select_one(self, selector):
+        if selector not in self._selected:
+            self._selected[selector] = self.backend.select_one(self.element, selector)
+        return self._selected[selector]
+
+
+USER_TABLE_COLUMNS = ("id", "username", "name", "role", "department", "register_date")
+
+
+def user_from_record(record, base_url):
+    """用户列表记录 (表格行或 JSON 接口) 转成输出格式"""
+    return {
+        "id": int(record["id"]),
+        "username": record["username"],
+        "name": record["name"],
+        "role": record["role"],
+        "department": record["department"],
+        "register_date": record["register_date"],
+        "detail_link": urljoin(base_url, f"/user/{record['id']}")
+    }
+
+
+def parse_user_table(html, base_url, backend=None):
+    """解析 /users 页面的用户表格"""
+    parser = get_backend(backend)
+    users = []
+    for row in parser.select(parser.parse(html), "table tbody tr"):
+        cols = [parser.text(col) for col in parser.select(row, "td")]
+        if len(cols) >= 6:
+            users.append(user_from_record(dict(zip(USER_TABLE_COLUMNS, cols)), base_url))
+    return users
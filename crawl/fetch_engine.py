@@ -0,0 +1,182 @@
+"""异步抓取引擎
+
+基于 aiohttp 的连接池 (keep-alive 复用连接, 缓存 DNS 解析结果), 用全局并发上限和单主机并发上限
+控制同时在途的请求数; http2=True 时改用 httpx 的 HTTP/2 连接, 同一主机的请求在一条连接上多路复用.
+每个请求发出前经过按主机的令牌桶限速 (见 rate_limiter),
+配置了 HttpCache 时 GET 请求会带上条件请求头, 304 响应直接使用缓存的正文 (见 http_cache),
+crawl.core 只创建一个引擎, 按 crawl/targets.py 中目标配置的并发和限速参数并发抓取列表页和详情页.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from crawl.rate_limiter import THROTTLE_STATUSES, HostRateLimiter
+
+DEFAULT_CONCURRENCY = 20  # 全局同时在途请求数
+DEFAULT_PER_HOST = 8      # 单个主机同时在途请求数
+DEFAULT_TIMEOUT = 10
+DEFAULT_KEEPALIVE = 30    # 空闲连接在池中保留的秒数
+DEFAULT_DNS_TTL = 300     # DNS 解析结果缓存的秒数, 0 表示不缓存
+THROTTLE_RETRIES = 3      # 被 429/503 限流时的重试次数
+
+
+class FetchResult:
+    """一次抓取的结果"""
+
+    __slots__ = ('url', 'status', 'text', 'headers', 'elapsed', 'from_cache')
+
+    def __init__(self, url, status, text, headers, elapsed, from_cache=False):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.headers = headers
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            # 异常的字符串形式会用到 request_info, 不能传 None
+            request_info = aiohttp.RequestInfo(URL(self.url), "GET",
+                                               CIMultiDictProxy(CIMultiDict()), URL(self.url))
+            raise aiohttp.ClientResponseError(
+                request_info, (), status=self.status, message=f"HTTP {self.status} for {self.url}"
+            )
+
+
+class FetchEngine:
+    """共享连接池 + 并发限制的异步抓取器
+
+    用法:
+        async with FetchEngine(concurrency=20, per_host=8) as engine:
+            result = await engine.fetch(url)
+    并发由调用方决定 (多个任务同时调用 fetch, 例如 pagination, frontier), 引擎只限制同时在途的请求数.
+
+    rate_limiter 默认为自适应的 HostRateLimiter, 被 429/503 限流的请求会在限速器降速后重试.
+    cache 为 HttpCache 时启用条件请求.
+    per_host 同时是每个主机的连接池大小; keepalive 为空闲连接保留的秒数, dns_ttl 为 DNS 缓存秒数.
+    http2=True 时需要安装 httpx[http2]: HTTPS 站点通过 ALPN 协商 HTTP/2, 不支持时仍用 HTTP/1.1;
+    httpx 不缓存 DNS, 每个代理地址单独一个连接池.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, headers=None, rate_limiter=None,
+                 throttle_retries=THROTTLE_RETRIES, cache=None,
+                 keepalive=DEFAULT_KEEPALIVE, dns_ttl=DEFAULT_DNS_TTL, http2=False):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.http2 = http2
+        self.headers = headers or {}
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.throttle_retries = throttle_retries
+        self.cache = cache
+        self._session = None
+        self._http2_clients = {}
+        self._global_slots = asyncio.Semaphore(concurrency)
+        self._host_slots = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    async def __aenter__(self):
+        if self.http2:
+            try:
+                self._http2_client(None)
+            except ImportError:
+                raise RuntimeError("HTTP/2 需要安装 httpx 和 h2: pip install 'httpx[http2]'")
+            return self
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency, limit_per_host=self.per_host,
+            keepalive_timeout=self.keepalive,
+            use_dns_cache=bool(self.dns_ttl), ttl_dns_cache=self.dns_ttl or None,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        clients, self._http2_clients = self._http2_clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def _http2_client(self, proxy):
+        """httpx 只能在创建客户端时指定代理, 每个代理地址一个客户端 (连接池)"""
+        client = self._http2_clients.get(proxy)
+        if client is None:
+            import httpx
+            client = self._http2_clients[proxy] = httpx.AsyncClient(
+                http2=True, proxy=proxy, headers=self.headers, follow_redirects=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency,
+                                    max_keepalive_connections=self.concurrency,
+                                    keepalive_expiry=self.keepalive),
+            )
+        return client
+
+    async def fetch(self, url, method='GET', headers=None, proxy=None, raise_for_status=True,
+                    **kwargs):
+        """抓取单个 URL, HTTP 错误状态码会抛出异常; raise_for_status=False 时照常返回结果"""
+        cacheable = self.cache is not None and method == 'GET'
+        entry = None
+        if cacheable:
+            request_headers = {**self.headers, **(headers or {})}
+            entry = self.cache.lookup(url, request_headers)
+            if entry is not None:
+                headers = {**(headers or {}), **self.cache.conditional_headers(entry)}
+
+        for attempt in range(self.throttle_retries + 1):
+            result = await self._fetch_once(url, method, headers, proxy, **kwargs)
+            if result.status not in THROTTLE_STATUSES:
+                break
+
+        if entry is not None and result.status == 304:
+            return FetchResult(url, 200, entry['text'], result.headers, result.elapsed,
+                               from_cache=True)
+        if raise_for_status:
+            result.raise_for_status()
+        if cacheable and result.status == 200:
+            self.cache.store(url, request_headers, result.headers, result.text)
+        return result
+
+    async def _fetch_once(self, url, method, headers, proxy, **kwargs):
+        await self.rate_limiter.acquire(url)
+        host = urlsplit(url).netloc
+        async with self._global_slots, self._host_slots[host]:
+            start = time.perf_counter()
+            final_url, status, text, response_headers = await self._send(
+                method, url, headers, proxy, **kwargs)
+            result = FetchResult(final_url, status, text, response_headers,
+                                 time.perf_counter() - start)
+        self.rate_limiter.record(url, result.status, result.elapsed,
+                                 result.headers.get('Retry-After'))
+        return result
+
+    async def _send(self, method, url, headers, proxy, **kwargs):
+        """发出请求, 返回 (最终地址, 状态码, 正文, 响应头); 响应头的键不区分大小写"""
+        if self.http2:
+            response = await self._http2_client(proxy).request(method, url, headers=headers,
+                                                               **kwargs)
+            return (str(response.url), response.status_code, response.text,
+                    CIMultiDict(response.headers.multi_items()))
+        async with self._session.request(method, url, headers=headers, proxy=proxy,
+                                         **kwargs) as response:
+            return (str(response.url), response.status, await response.text(),
+                    CIMultiDict(response.headers))
+
+
+def run(coro):
+    """在同步代码中运行异步爬取流程"""
+    return asyncio.run(coro)
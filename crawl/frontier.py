@@ -0,0 +1,236 @@
+"""详情页抓取队列
+
+列表页上发现的详情链接 (/user/<id>, /product/<id>, /news/<id>) 全部加入 Frontier,
+按 (优先级, 深度, 入队顺序) 出队, 由固定数量的工作协程并发处理; 超过 max_depth 的链接不再入队.
+地址先规范化 (canonicalize_url), 写法不同的同一地址只入队一次; 已入队的地址记在布隆过滤器里
+(见 bloom), 百万级地址也只占几 MB 内存, 可以用 seen_path 保存到文件, 下次运行时跳过这些地址.
+各栏目共用一个队列, 详情页的总并发由工作协程数决定, 不再为了控制耗时只抽样抓取几个详情页.
+
+用法:
+    async with Frontier(handler, workers=20) as frontier:
+        records = await fetch_details(frontier, records, "link", schema, priority=1)
+"""
+import asyncio
+import itertools
+import os
+import re
+from collections import deque
+from urllib.parse import quote, urlsplit, urlunsplit
+
+from crawl.bloom import ScalableBloomFilter
+
+DEFAULT_WORKERS = 20
+DETAIL_WINDOW = 50  # 最多同时为多少个列表页抓详情, 超过时等最早的一页完成
+DEFAULT_PORTS = {"http": 80, "https": 443}
+PERCENT_RE = re.compile(r"%([0-9a-fA-F]{2})")
+UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+PATH_SAFE = "/%:@!$&'()*+,;=-._~"
+QUERY_SAFE = "/?%:@!$'()*+,;=-._~"
+
+
+def _normalize_escape(match):
+    # 不需要编码的字符直接解码, 其余的十六进制统一大写
+    char = chr(int(match.group(1), 16))
+    return char if char in UNRESERVED else "%" + match.group(1).upper()
+
+
+def _remove_dot_segments(path):
+    segments = []
+    for segment in path.split("/")[1:]:
+        if segment == "..":
+            if segments:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+    # 以 . 或 .. 结尾时保留末尾的 "/"
+    if path.endswith(("/.", "/..")):
+        segments.append("")
+    return "/" + "/".join(segments)
+
+
+def _normalize_component(text):
+    return quote(PERCENT_RE.sub(_normalize_escape, text), safe=QUERY_SAFE)
+
+
+def _normalize_query(query):
+    # 不解码成键值对再编码: 没有 "=" 的参数 (?flag) 保持原样, "+" 和 %2B 也不混淆;
+    # 只按参数名排序, 同名参数保持原来的先后顺序 (sorted 是稳定排序)
+    params = []
+    for part in query.split("&"):
+        if not part:
+            continue
+        name, sep, value = part.partition("=")
+        params.append((_normalize_component(name), sep + _normalize_component(value)))
+    params.sort(key=lambda param: param[0])
+    return "&".join(name + value for name, value in params)
+
+
+def canonicalize_url(url):
+    """规范化地址: 协议和主机名小写, 去掉默认端口和片段 (#...), 路径解析 . 和 ..,
+    百分号编码统一 (非 ASCII 字符编码, 不需要编码的字符解码), 查询参数按名字排序
+    (同名参数的先后顺序不变, 没有值的参数不补 "=")"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"  # IPv6
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    userinfo = parts.netloc.rpartition("@")[0]
+    netloc = f"{userinfo}@{host}" if userinfo else host
+    path = quote(PERCENT_RE.sub(_normalize_escape, parts.path), safe=PATH_SAFE)
+    path = _remove_dot_segments(path) if path else "/"
+    query = _normalize_query(parts.query)
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class Frontier:
+    """带去重、深度和优先级的抓取队列
+
+    handler(url, data) 是处理一个链接 (add 时传入的原地址) 的协程函数, add 返回的 Future
+    在处理完成时得到它的返回值 (或异常). 优先级数字越小越先处理, 同优先级时深度小的先处理,
+    再按入队顺序.
+    seen 为已入队地址 (规范化后) 的集合, 默认是布隆过滤器 (极小概率把新地址误判为已见过), 也可以传入 set.
+    seen_path 不为 None 时启动时从该文件载入布隆过滤器, 退出时保存回去.
+    """
+
+    def __init__(self, handler, workers=DEFAULT_WORKERS, max_depth=None, seen=None,
+                 seen_path=None):
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.seen_path = seen_path
+        if seen is None and seen_path and os.path.exists(seen_path):
+            seen = ScalableBloomFilter.load(seen_path)
+        self.seen = seen if seen is not None else ScalableBloomFilter()
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._tasks = []
+
+    async def __aenter__(self):
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exc):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.seen_path:
+            self.seen.save(self.seen_path)
+
+    @property
+    def queued(self):
+        """排队等待处理的链接数 (不含工作协程正在处理的)"""
+        return self._queue.qsize()
+
+    @property
+    def seen_count(self):
+        """入队过的不同地址数 (规范化后); 布隆过滤器不计误判为已见过的地址"""
+        return len(self.seen)
+
+    def add(self, url, priority=0, depth=0, data=None):
+        """加入一个链接, 返回处理结果的 Future; 已经加入过或超过最大深度时返回 None"""
+        if self.max_depth is not None and depth > self.max_depth:
+            return None
+        # 规范化的地址只用来去重, 请求时仍用原地址 (服务器不一定认规范化后的写法)
+        key = canonicalize_url(url)
+        if key in self.seen:
+            return None
+        self.seen.add(key)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((priority, depth, next(self._order), url, data, future))
+        return future
+
+    async def join(self):
+        """等待队列中的链接全部处理完"""
+        await self._queue.join()
+
+    async def _work(self):
+        while True:
+            _, _, _, url, data, future = await self._queue.get()
+            try:
+                result = await self.handler(url, data)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+
+class DetailFetchError(Exception):
+    """有详情页抓取失败; urls 为失败的详情页地址"""
+
+    def __init__(self, urls, cause=None):
+        self.urls = list(urls)
+        super().__init__(f"{len(self.urls)} 个详情页抓取失败 "
+                         f"({', '.join(self.urls[:3])}{' ...' if len(self.urls) > 3 else ''})"
+                         + (f": {cause}" if cause else ""))
+
+
+async def fetch_details(frontier, records, key, data=None, priority=0, depth=1, fields=()):
+    """把每条记录的 key 链接加入队列, 等全部处理完后把结果 (字典) 合并进记录, 返回 records
+
+    fields 中的字段在每条记录里都会出现, 取不到 (没有链接、链接重复或详情页里没有) 时为 None.
+    有详情页处理失败时, 等其余链接处理完后抛出 DetailFetchError, 调用方不应把这一页记为完成.
+    """
+    futures = [(record, frontier.add(record[key], priority, depth, data))
+               for record in records if record.get(key)]
+    failed, cause = [], None
+    for record, future in futures:
+        if future is None:
+            continue
+        try:
+            record.update(await future)
+        except Exception as e:
+            print(f"爬取详情失败: {record[key]}: {e}")
+            failed.append(record[key])
+            cause = cause or e
+    for record in records:
+        for field in fields:
+            record.setdefault(field, None)
+    if failed:
+        raise DetailFetchError(failed, cause)
+    return records
+
+
+async def iter_with_details(pages, enrich, window=DETAIL_WINDOW):
+    """pages 是产出 (url, 记录) 的异步迭代器; 每页一到就调用 enrich(记录) 开始抓详情,
+    不必等前一页的详情抓完, 按原来的页面顺序产出详情已合并的 (url, 记录).
+    某页的 enrich 失败时跳过这一页, 其余页面照常产出; pages 抛出异常时, 已经开始抓详情的页面
+    先全部产出. 最后把遇到的第一个异常交给调用方"""
+    pending = deque()
+    errors = []
+
+    async def settle(url, task):
+        try:
+            return await task
+        except Exception as e:
+            print(f"{url} 的详情没有抓完, 这一页不记为完成: {e}")
+            errors.append(e)
+            return None
+
+    try:
+        try:
+            async for url, records in pages:
+                pending.append((url, asyncio.ensure_future(enrich(records))))
+                while pending and (pending[0][1].done() or len(pending) >= window):
+                    url, task = pending.popleft()
+                    records = await settle(url, task)
+                    if records is not None:
+                        yield url, records
+        except Exception as e:
+            errors.insert(0, e)
+        while pending:
+            url, task = pending.popleft()
+            records = await settle(url, task)
+            if records is not None:
+                yield url, records
+    finally:
+        for _, task in pending:
+            task.cancel()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,107 @@
+"""磁盘 HTTP 响应缓存
+
+以 URL + Vary 请求头为键保存响应正文和 ETag/Last-Modified,
+再次抓取时发送 If-None-Match / If-Modified-Since, 服务端返回 304 时直接用缓存的正文.
+缓存总大小有上限, 超出时按最近最少使用 (LRU) 淘汰.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = ".http_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_VARY = ("Accept", "Accept-Language")
+
+
+class HttpCache:
+    """按 LRU 淘汰的磁盘响应缓存
+
+    每个条目一个 JSON 文件; 文件的修改时间记录最近访问时间, 启动时据此恢复 LRU 顺序.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, vary=DEFAULT_VARY):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.vary = tuple(h.lower() for h in vary)
+        self._entries = OrderedDict()  # key -> 文件大小, 按访问时间从旧到新
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._size += size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def key(self, url, headers=None):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        parts = [url] + [f"{h}={headers.get(h, '')}" for h in self.vary]
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(self, url, headers=None):
+        """返回缓存条目 dict, 没有则返回 None"""
+        key = self.key(url, headers)
+        if key not in self._entries:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._forget(key)
+            return None
+        self._entries.move_to_end(key)
+        os.utime(self._path(key))
+        return entry
+
+    def conditional_headers(self, entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, request_headers, response_headers, text):
+        """保存带有校验器 (ETag/Last-Modified) 的响应, 没有校验器的响应不缓存"""
+        response_headers = {k.lower(): v for k, v in response_headers.items()}
+        etag = response_headers.get("etag")
+        last_modified = response_headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        key = self.key(url, request_headers)
+        data = json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "text": text,
+        }, ensure_ascii=False).encode("utf-8")
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self._size -= self._entries.pop(key, 0)
+        self._entries[key] = len(data)
+        self._size += len(data)
+        self._evict()
+
+    def _forget(self, key):
+        self._size -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._forget(oldest)
@@ -0,0 +1,202 @@
+"""静态优先的混合抓取: 先用普通 HTTP 请求, 页面内容靠 JS 渲染时才交给浏览器池
+
+HybridFetcher.fetch 与 FetchEngine.fetch 用法相同 (返回 FetchResult), 可以直接替换 engine 传给
+iter_pages / crawl_detail 等. 每个地址先按普通请求抓取, 出现下面的情况时认为页面需要浏览器:
+    - expect 里为该类页面登记的选择器在静态 HTML 里找不到 (见 schemas.PAGE_ITEMS)
+    - 没有登记选择器, 但页面只是一个脚本外壳: 可见文本很少, 有 <script> 或空的挂载节点 (#root / #app)
+    - 403/503 且正文带脚本 (JS 反爬挑战页)
+这时在浏览器池里渲染同一地址 (见 browser_pool, rendering), 渲染结果里找到了预期内容,
+以后同一地址模式 (url_pattern: 数字等 ID 段替换为 {id}, 只保留查询参数名) 的页面直接用浏览器;
+否则 (浏览器里也没有) 说明不是 JS 的问题, 该模式以后只用普通请求.
+每个模式只判断一次, 判断结果可以用 decisions_path 保存到文件, 下次运行直接使用.
+
+用法:
+    async with FetchEngine() as engine, HybridFetcher(engine, PAGE_ITEMS) as fetcher:
+        result = await fetcher.fetch(url)
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from functools import partial
+from urllib.parse import parse_qsl, urlsplit
+
+from multidict import CIMultiDict
+
+from crawl.browser_pool import DEFAULT_POOL_SIZE, BrowserPool
+from crawl.fetch_engine import FetchResult
+from crawl.parser_backends import get_backend
+from crawl.rendering import render
+
+STATIC, BROWSER = "static", "browser"
+DEFAULT_DECISIONS = "render_decisions.json"
+SHELL_TEXT_CHARS = 200          # 可见文本少于这么多字符的页面可能只是脚本外壳
+CHALLENGE_STATUSES = (403, 503)
+ID_SEGMENT_RE = re.compile(r"^(?:\d+|[0-9a-fA-F]{16,}|[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12})$")
+MOUNT_POINT_RE = re.compile(
+    r"<div[^>]*\bid=[\"'](?:root|app|__next|__nuxt)[\"'][^>]*>\s*</div>", re.IGNORECASE)
+NOSCRIPT_RE = re.compile(r"enable javascript|启用\s*javascript|开启\s*javascript", re.IGNORECASE)
+
+
+def path_pattern(path):
+    """路径中的 ID 段 (数字、长十六进制串、UUID) 替换为 {id}"""
+    segments = ["{id}" if ID_SEGMENT_RE.match(segment) else segment
+                for segment in path.split("/")]
+    return "/".join(segments) or "/"
+
+
+def url_pattern(url):
+    """地址模式: 主机 + path_pattern + 排序后的查询参数名, 例如 example.com/product/{id}"""
+    parts = urlsplit(url)
+    pattern = parts.netloc.lower() + path_pattern(parts.path)
+    keys = sorted({key for key, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    return pattern + ("?" + "&".join(keys) if keys else "")
+
+
+def needs_browser(result, expect=None, backend=None):
+    """静态抓取结果是否需要浏览器渲染, 需要时返回原因, 否则返回 None"""
+    text = result.text or ""
+    head = text[:2048].lower()
+    if result.status in CHALLENGE_STATUSES:
+        return f"HTTP {result.status} 挑战页" if "<script" in text.lower() else None
+    if result.status >= 400 or "<" not in head:
+        return None  # 错误页面或 JSON 等非 HTML 内容, 浏览器帮不上忙
+    backend = get_backend(backend)
+    document = backend.parse(text)
+    if expect:
+        return None if backend.select_one(document, expect) is not None else f"缺少 {expect}"
+    if len(backend.text(document)) < SHELL_TEXT_CHARS:
+        if MOUNT_POINT_RE.search(text) or NOSCRIPT_RE.search(text):
+            return "脚本外壳页面"
+        if "<script" in text.lower():
+            return "可见文本过少"
+    return None
+
+
+def default_driver_factory():
+    """默认用 crawl.chrome.init_driver 创建浏览器 (第一次需要浏览器时才导入 selenium)"""
+    from crawl.chrome import init_driver
+    return init_driver
+
+
+class HybridFetcher:
+    """静态优先、按地址模式缓存判断结果的抓取器
+
+    engine 为 FetchEngine; expect 把 path_pattern 映射到该类页面一定会出现的选择器;
+    pool 为已有的 BrowserPool, None 时在第一次需要浏览器时用 driver_factory 创建 pool_size 个会话的池.
+    """
+
+    def __init__(self, engine, expect=None, pool=None, driver_factory=None,
+                 pool_size=DEFAULT_POOL_SIZE, decisions_path=DEFAULT_DECISIONS, backend=None):
+        self.engine = engine
+        self.expect = dict(expect or {})
+        self.pool = pool
+        self._own_pool = pool is None
+        self.driver_factory = driver_factory
+        self.pool_size = pool_size
+        self.decisions_path = decisions_path
+        self.backend = backend
+        self.decisions = {}
+        if decisions_path and os.path.exists(decisions_path):
+            with open(decisions_path, encoding="utf-8") as f:
+                self.decisions = json.load(f)
+        self.stats = Counter()
+        self._probing = defaultdict(asyncio.Lock)
+        self._fallback = set()  # 浏览器渲染失败的模式, 本次运行只用普通请求 (不保存)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._own_pool and self.pool is not None:
+            await asyncio.to_thread(self.pool.close)
+            self.pool = None
+        self.save()
+        if self.stats:
+            print(f"混合抓取: 静态 {self.stats[STATIC]} 页, 浏览器 {self.stats[BROWSER]} 页, "
+                  f"升级判断 {self.stats['probe']} 次")
+
+    def save(self):
+        if not self.decisions_path:
+            return
+        tmp = self.decisions_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.decisions, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.decisions_path)
+
+    def expected(self, url):
+        return self.expect.get(path_pattern(urlsplit(url).path))
+
+    async def fetch(self, url, **kwargs):
+        """抓取一个地址, 返回 FetchResult; 浏览器渲染的结果 status 为 200, headers 为空"""
+        pattern = url_pattern(url)
+        decision = self._decision(pattern)
+        if decision is None:
+            # 同一模式只由第一个请求判断, 其余请求等判断结果
+            async with self._probing[pattern]:
+                decision = self._decision(pattern)
+                if decision is None:
+                    return await self._probe(url, pattern, **kwargs)
+        if decision == BROWSER:
+            return await self._render(url)
+        self.stats[STATIC] += 1
+        return await self.engine.fetch(url, **kwargs)
+
+    def _decision(self, pattern):
+        return STATIC if pattern in self._fallback else self.decisions.get(pattern)
+
+    async def _probe(self, url, pattern, raise_for_status=True, **kwargs):
+        # 挑战页通常是 403/503, 先不抛出异常, 看过正文再决定; 不升级到浏览器时按调用方的要求抛出
+        expect = self.expected(url)
+        result = await self.engine.fetch(url, raise_for_status=False, **kwargs)
+        reason = needs_browser(result, expect, self.backend)
+        if reason is None:
+            self.decisions[pattern] = STATIC
+            self.stats[STATIC] += 1
+            return _checked(result, raise_for_status)
+        self.stats["probe"] += 1
+        print(f"{url} 需要浏览器渲染 ({reason}), 改用浏览器池")
+        try:
+            rendered = await self._render(url)
+        except Exception as e:
+            print(f"浏览器渲染失败, 本次运行 {pattern} 只用普通请求: {url}: {e}")
+            self._fallback.add(pattern)
+            return _checked(result, raise_for_status)
+        if needs_browser(rendered, expect, self.backend) is None:
+            self.decisions[pattern] = BROWSER
+            return rendered
+        # 浏览器里也没有预期内容, 不是 JS 渲染的问题
+        print(f"{url} 在浏览器中同样缺少预期内容, {pattern} 继续使用普通请求")
+        self.decisions[pattern] = STATIC
+        return _checked(result, raise_for_status)
+
+    def _browser_pool(self):
+        if self.pool is None:
+            factory = self.driver_factory or default_driver_factory()
+            self.pool = BrowserPool(factory, size=self.pool_size)
+        return self.pool
+
+    async def _render(self, url):
+        pool = self._browser_pool()  # 在事件循环线程里创建, 避免多个线程同时创建
+        handler = partial(_render_page, selector=self.expected(url))
+        result = await asyncio.to_thread(pool.run, url, handler)
+        self.stats[BROWSER] += 1
+        return result
+
+
+def _checked(result, raise_for_status):
+    if raise_for_status:
+        result.raise_for_status()
+    return result
+
+
+def _render_page(driver, url, selector=None):
+    start = time.perf_counter()
+    render(driver, url, selector=selector)
+    return FetchResult(driver.current_url, 200, driver.page_source, CIMultiDict(),
+                       time.perf_counter() - start)
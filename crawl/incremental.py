@@ -0,0 +1,76 @@
+"""增量爬取状态
+
+记录上次爬取到的每个条目 (按 id/链接) 及其内容哈希.
+列表页内容没变的条目直接沿用上次抓到的详情字段, 只为新增或变化的条目抓详情页;
+输出时逐页 observe, 数据集写完后 finish 算出与上次的差异 (新增/变化/删除), 最后 save 保存状态.
+"""
+import hashlib
+import json
+import os
+
+DEFAULT_STATE_FILE = "crawl_state.json"
+
+
+def content_hash(record, exclude=()):
+    """条目内容哈希, exclude 中的字段 (例如详情页字段) 不参与计算"""
+    data = {k: v for k, v in record.items() if k not in exclude}
+    raw = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def delta_filename(filename):
+    """products.json -> products.delta.json"""
+    root, ext = os.path.splitext(filename)
+    return f"{root}.delta{ext}"
+
+
+class IncrementalStore:
+    """保存在 JSON 文件中的增量状态: {数据集: {键: {"hash": ..., "record": ...}}}"""
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        self.state = {}
+        self._pending = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def reuse(self, dataset, key, record, fields, exclude=()):
+        """条目未变化且上次已抓到 fields 时, 把这些字段复制进 record 并返回 True"""
+        entry = self.state.get(dataset, {}).get(str(key))
+        if entry is None or entry["hash"] != content_hash(record, exclude):
+            return False
+        previous = entry["record"]
+        if not all(field in previous for field in fields):
+            return False
+        record.update({field: previous[field] for field in fields})
+        return True
+
+    def begin(self, dataset):
+        """开始记录一个数据集: 之后逐页调用 observe, 最后调用 finish"""
+        self._pending[dataset] = ({}, {"added": [], "changed": [], "removed": []})
+
+    def observe(self, dataset, records, key, exclude=()):
+        old = self.state.get(dataset, {})
+        new, delta = self._pending[dataset]
+        for record in records:
+            record_key = str(record[key])
+            digest = content_hash(record, exclude)
+            new[record_key] = {"hash": digest, "record": record}
+            if record_key not in old:
+                delta["added"].append(record)
+            elif old[record_key]["hash"] != digest:
+                delta["changed"].append(record)
+
+    def finish(self, dataset):
+        """用本次结果替换数据集状态, 返回与上次相比的差异"""
+        new, delta = self._pending.pop(dataset)
+        delta["removed"] = [k for k in self.state.get(dataset, {}) if k not in new]
+        self.state[dataset] = new
+        return delta
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
@@ -0,0 +1,191 @@
+"""分页规划
+
+先抓第 1 页, 从 "第 N 页/共 M 页" 读出总页数, 然后把剩余页面一次性全部并发调度;
+页面上没有总页数时, 退回到顺序跟随 "下一页" 链接.
+
+站点提供 JSON 接口 (/api/...) 时, iter_api_pages 按游标大批量翻页, 不需要解析 HTML;
+fetch_api_records 通过 ids= 批量获取详情记录.
+
+抓取失败的页面不会被跳过: 成功的页面照常产出, 最后抛出 PageFetchError (第 1 页失败时直接抛出),
+调用方据此保留 .part 输出文件和检查点 (见 sinks.drain), 而不是把缺页的结果当作完整结果.
+"""
+import asyncio
+import json
+import re
+from urllib.parse import urlencode, urljoin
+
+TOTAL_PAGES_RE = re.compile(r"第\s*\d+\s*页\s*/\s*共\s*(\d+)\s*页")
+NEXT_PAGE_SELECTOR = '.pagination a[href*="page="]:-soup-contains("下一页")'
+API_PAGE_SIZE = 500  # JSON 接口每页条数 (服务端上限 1000)
+
+
+class ApiUnavailable(Exception):
+    """站点没有可用的 JSON 接口 (第一页请求失败或返回的不是 JSON)"""
+
+
+class PageFetchError(Exception):
+    """有页面抓取失败; urls 为失败的页面地址"""
+
+    def __init__(self, base_path, urls, cause=None):
+        self.urls = list(urls)
+        super().__init__(f"{base_path}: {len(self.urls)} 个页面抓取失败 "
+                         f"({', '.join(self.urls[:3])}{' ...' if len(self.urls) > 3 else ''})"
+                         + (f": {cause}" if cause else ""))
+
+
+def page_url(base_url, base_path, page):
+    return urljoin(base_url, f"{base_path}?page={page}")
+
+
+def parse_total_pages(html):
+    """从分页栏 "第 N 页/共 M 页" 读出总页数, 读不到返回 None (直接匹配正文, 无需解析)"""
+    match = TOTAL_PAGES_RE.search(html)
+    return int(match.group(1)) if match else None
+
+
+def find_next_page(html, current_url):
+    """返回 "下一页" 链接的绝对地址, 没有则返回 None"""
+    from bs4 import BeautifulSoup  # 只在页面上没有总页数时用到, 不在启动时导入
+    link = BeautifulSoup(html, 'html.parser').select_one(NEXT_PAGE_SELECTOR)
+    return urljoin(current_url, link["href"]) if link else None
+
+
+async def iter_pages(fetch, base_url, base_path, max_pages=None, checkpoint=None, parse=None):
+    """按页码顺序逐页产出 (url, 解析结果)
+
+    fetch: 协程函数, fetch(url) 返回带 .text 的响应
+    parse: 协程函数, parse(html) 返回解析结果; 默认返回 BeautifulSoup 对象.
+        每页的解析在该页自己的任务里进行, 多个页面的解析可以并行 (见 parse_pool)
+    max_pages: 最多抓取的页数, None 表示不限制
+    checkpoint: 可选的 Checkpoint; 规划好的页面会记入其待抓取队列,
+        已完成的页面不再抓取也不再产出 (由调用方从检查点重放)
+    """
+    dataset = base_path
+
+    def done(url):
+        return checkpoint is not None and checkpoint.is_done(dataset, url)
+
+    async def fetch_page(url):
+        print(f"正在爬取: {url}")
+        html = (await fetch(url)).text
+        if parse is None:
+            from bs4 import BeautifulSoup
+            return html, BeautifulSoup(html, 'html.parser')
+        return html, await parse(html)
+
+    url = page_url(base_url, base_path, 1)
+    total = checkpoint.total(dataset) if checkpoint is not None else None
+    html = None
+    if not done(url):
+        if checkpoint is not None:
+            checkpoint.plan(dataset, [url])
+        try:
+            html, result = await fetch_page(url)
+        except Exception as e:
+            raise PageFetchError(base_path, [url], e) from e
+        total = parse_total_pages(html)
+        if checkpoint is not None and total is not None:
+            checkpoint.set_total(dataset, total)
+        yield url, result
+
+    if total is not None:
+        if max_pages is not None:
+            total = min(total, max_pages)
+        # 总页数已知: 剩余页面全部并发调度, 按页码顺序产出
+        urls = [page_url(base_url, base_path, page) for page in range(2, total + 1)]
+        urls = [u for u in urls if not done(u)]
+        if checkpoint is not None:
+            checkpoint.plan(dataset, urls)
+        tasks = [asyncio.ensure_future(fetch_page(u)) for u in urls]
+        failed = []
+        try:
+            for url, task in zip(urls, tasks):
+                try:
+                    html, result = await task
+                except Exception as e:
+                    # 其余页面照常产出, 全部结束后再报告失败的页面
+                    print(f"爬取失败: {url}: {e}")
+                    failed.append(url)
+                    continue
+                yield url, result
+        finally:
+            for task in tasks:
+                task.cancel()
+        if failed:
+            raise PageFetchError(base_path, failed)
+        return
+
+    # 没有总页数: 顺序跟随下一页链接
+    pages = 1
+    if html is None:
+        # 第 1 页已在检查点中完成, 从待抓取队列里最早的页面接着走
+        url = checkpoint.next_pending(dataset)
+        if url is None:
+            return
+        try:
+            html, result = await fetch_page(url)
+        except Exception as e:
+            raise PageFetchError(base_path, [url], e) from e
+        pages += 1
+        yield url, result
+    while max_pages is None or pages < max_pages:
+        url = find_next_page(html, url)
+        if not url:
+            break
+        if checkpoint is not None:
+            checkpoint.plan(dataset, [url])
+        try:
+            html, result = await fetch_page(url)
+        except Exception as e:
+            raise PageFetchError(base_path, [url], e) from e
+        pages += 1
+        if not done(url):
+            yield url, result
+
+
+def api_url(base_url, api_path, **params):
+    query = urlencode({k: v for k, v in params.items() if v is not None})
+    return urljoin(base_url, f"{api_path}?{query}")
+
+
+async def iter_api_pages(fetch, base_url, api_path, limit=API_PAGE_SIZE, checkpoint=None):
+    """按游标逐页产出 JSON 接口的 (url, items)
+
+    第一页就失败时抛出 ApiUnavailable, 调用方可以退回到解析 HTML 页面; 之后的页面失败时抛出 PageFetchError.
+    checkpoint: 可选的 Checkpoint; 下一页地址在产出当前页之前记入待抓取队列,
+        中断后从最早未完成的页面继续 (已完成页面由调用方从检查点重放)
+    """
+    dataset = api_path
+    url = api_url(base_url, api_path, limit=limit)
+    first = True
+    if checkpoint is not None and checkpoint.is_done(dataset, url):
+        url = checkpoint.next_pending(dataset)
+        first = False
+    while url is not None:
+        print(f"正在爬取: {url}")
+        try:
+            payload = json.loads((await fetch(url)).text)
+            items, next_cursor = payload["items"], payload.get("next_cursor")
+        except Exception as e:
+            if first:
+                raise ApiUnavailable(f"{api_path}: {e}") from e
+            raise PageFetchError(api_path, [url], e) from e
+        first = False
+        next_url = None
+        if next_cursor is not None:
+            next_url = api_url(base_url, api_path, limit=limit, cursor=next_cursor)
+            if checkpoint is not None:
+                checkpoint.plan(dataset, [next_url])
+        yield url, items
+        url = next_url
+
+
+async def fetch_api_records(fetch, base_url, api_path, ids, batch=API_PAGE_SIZE):
+    """通过 ids= 批量接口获取完整记录, 返回 {id: 记录}"""
+    ids = list(ids)
+    responses = await asyncio.gather(*(
+        fetch(api_url(base_url, api_path, ids=",".join(map(str, ids[i:i + batch]))))
+        for i in range(0, len(ids), batch)
+    ))
+    return {record["id"]: record
+            for response in responses for record in json.loads(response.text)["items"]}
@@ -0,0 +1,51 @@
+"""HTML 解析进程池
+
+抓取协程拿到正文后交给进程池里的解析进程, 解析不再占用事件循环所在的线程 (GIL),
+解析吞吐随 CPU 核数扩展. 同时在途的解析任务数有上限 (有界队列):
+解析积压时新的正文提交会等待, 形成背压, 内存不会无限增长.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+class ParsePool:
+    """解析进程池
+
+    workers: 解析进程数, None 表示 CPU 核数, 0 表示在当前进程内直接解析
+    queue_size: 同时提交给进程池的任务上限, 默认为进程数的 4 倍
+    backend: 本次爬取使用的解析后端名 (见 parser_backends), 由调用方传给解析函数
+    提交的函数和参数必须可以 pickle (模块级函数 + schemas.compile_schema 的结果).
+    """
+
+    def __init__(self, workers=None, queue_size=None, backend=None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.backend = backend
+        self._executor = ProcessPoolExecutor(workers) if workers > 0 else None
+        self._slots = asyncio.Semaphore(queue_size or max(workers, 1) * 4)
+
+    async def run(self, func, *args):
+        if self._executor is None:
+            return func(*args)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
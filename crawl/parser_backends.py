@@ -0,0 +1,136 @@
+"""可切换的 HTML 解析后端
+
+提取层 (extraction) 只通过这里的统一接口访问文档: parse / select / select_one / text / attr.
+三个后端的结果完全一致:
+    html.parser  BeautifulSoup + 标准库解析器 (默认, 最慢, 不需要额外依赖)
+    lxml         lxml.html + cssselect (pip install lxml cssselect)
+    selectolax   selectolax 的 lexbor 引擎 (pip install selectolax), 通常最快
+
+text() 与 bs4 的 get_text(strip=True) 语义相同: 每段文本去掉首尾空白后直接拼接,
+<script> / <style> / <template> 和注释不计入文本 (lxml / selectolax 在解析时删除这些节点).
+"""
+import re
+
+DEFAULT_PARSER = "html.parser"
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+# bs4 的 get_text 不包含这些元素里的文本
+NON_TEXT_TAGS = ("script", "style", "template")
+
+# libxml2 会丢弃 </html> 之后的内容 (测试站点的正文恰好渲染在那里),
+# 浏览器和另外两个后端都保留它们, 所以交给 lxml 之前先去掉这两个结束标签
+DOCUMENT_END_RE = re.compile(r"</(?:body|html)\s*>", re.IGNORECASE)
+
+
+class Bs4Backend:
+    name = "html.parser"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse(self, html):
+        return self._soup(html, 'html.parser')
+
+    def select(self, node, selector):
+        return node.select(selector)
+
+    def select_one(self, node, selector):
+        return node.select_one(selector)
+
+    def text(self, node):
+        return node.get_text(strip=True)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        try:
+            import lxml.html
+            from lxml import etree
+            from lxml.cssselect import CSSSelector
+        except ImportError:
+            raise RuntimeError("lxml 解析后端需要安装 lxml 和 cssselect: pip install lxml cssselect")
+        self._html = lxml.html
+        self._etree = etree
+        self._selector_class = CSSSelector
+        self._selectors = {}
+
+    def _compiled(self, selector):
+        compiled = self._selectors.get(selector)
+        if compiled is None:
+            compiled = self._selectors[selector] = self._selector_class(selector)
+        return compiled
+
+    def parse(self, html):
+        doc = self._html.document_fromstring(DOCUMENT_END_RE.sub("", html))
+        self._etree.strip_elements(doc, self._etree.Comment, *NON_TEXT_TAGS, with_tail=False)
+        return doc
+
+    def select(self, node, selector):
+        found = self._compiled(selector)(node)
+        # 与 bs4 一致只返回后代元素; 节点自身匹配时按文档顺序排在第一个
+        return found[1:] if found and found[0] is node else found
+
+    def select_one(self, node, selector):
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    def text(self, node):
+        return "".join(part.strip() for part in node.itertext())
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            raise RuntimeError("selectolax 解析后端需要安装 selectolax: pip install selectolax")
+        self._parser = LexborHTMLParser
+
+    def parse(self, html):
+        tree = self._parser(html)
+        tree.strip_tags(list(NON_TEXT_TAGS))
+        return tree.root
+
+    def select(self, node, selector):
+        found = node.css(selector)
+        return found[1:] if found and found[0] == node else found
+
+    def select_one(self, node, selector):
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    def text(self, node):
+        return node.text(deep=True, separator='', strip=True)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+
+_BACKEND_CLASSES = {
+    "html.parser": Bs4Backend,
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+}
+_backends = {}
+
+
+def get_backend(name=None):
+    """按名字取解析后端 (每个进程内只创建一次), None 表示默认后端"""
+    name = name or DEFAULT_PARSER
+    backend = _backends.get(name)
+    if backend is None:
+        if name not in _BACKEND_CLASSES:
+            raise ValueError(f"未知的解析后端: {name}, 可选: {', '.join(PARSER_BACKENDS)}")
+        backend = _backends[name] = _BACKEND_CLASSES[name]()
+    return backend
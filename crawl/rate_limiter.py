@@ -0,0 +1,117 @@
+"""按主机限速
+
+每个主机一个令牌桶 (速率 + 突发量), 所有请求发出前先取令牌.
+开启自适应后, 根据响应耗时和 429/503 调整速率: 被限流时速率减半并遵守 Retry-After,
+响应正常且耗时低于目标时速率逐步回升 (AIMD), 从而逼近主机能承受的最大速率.
+"""
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = 10.0      # 每秒请求数
+DEFAULT_BURST = 10       # 桶容量
+THROTTLE_STATUSES = (429, 503)
+
+
+def _check_rate(rate, burst):
+    # 桶容量不到 1 个令牌时 acquire 永远等不到令牌
+    if rate <= 0:
+        raise ValueError(f"rate 必须大于 0: {rate}")
+    if burst < 1:
+        raise ValueError(f"burst 至少为 1: {burst}")
+
+
+class TokenBucket:
+    """单个主机的令牌桶"""
+
+    def __init__(self, rate, burst):
+        _check_rate(rate, burst)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, jitter=0.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        if jitter:
+            await asyncio.sleep(random.uniform(0, jitter / self.rate))
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class HostRateLimiter:
+    """按主机分桶的限速器
+
+    rate/burst: 初始速率和突发量
+    adaptive: 是否根据响应自适应调整速率
+    min_rate/max_rate: 自适应调整的上下限
+    latency_target: 响应耗时超过该值 (秒) 时视为主机吃力, 速率下调
+    jitter: 在令牌间隔上附加的随机抖动比例, 0 表示不抖动
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, adaptive=True,
+                 min_rate=0.5, max_rate=None, latency_target=1.0, jitter=0.0):
+        _check_rate(rate, burst)
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate * 10
+        self.latency_target = latency_target
+        self.jitter = jitter
+        self._buckets = {}
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def acquire(self, url):
+        await self.bucket(url).acquire(self.jitter)
+
+    def record(self, url, status, elapsed, retry_after=None):
+        """把一次响应的结果反馈给限速器"""
+        if not self.adaptive:
+            return
+        if status in THROTTLE_STATUSES:
+            self.penalize(url, _parse_retry_after(retry_after))
+            return
+        bucket = self.bucket(url)
+        if elapsed > self.latency_target:
+            bucket.rate = max(self.min_rate, bucket.rate * 0.9)
+        elif status < 400:
+            bucket.rate = min(self.max_rate, bucket.rate + 1)
+
+    def penalize(self, url, pause=None):
+        """主机限流或请求失败: 速率减半并暂停发放令牌"""
+        bucket = self.bucket(url)
+        bucket.rate = max(self.min_rate, bucket.rate / 2)
+        bucket.pause(pause or 1 / bucket.rate)
+
+
+def _parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,221 @@
+"""浏览器渲染辅助: 按就绪信号等待页面, 不再固定睡眠
+
+render 打开页面后在浏览器里执行一段异步脚本, 同时满足以下条件时立即返回:
+    - selector 给出时页面上已经出现匹配的元素, 否则 document.readyState 为 complete
+    - 没有进行中的 fetch/XHR 请求 (需要先 install_request_tracker), 且 quiet_ms 内没有新的资源加载
+    - quiet_ms 内 DOM 没有变化 (MutationObserver)
+超过 budget 秒仍未就绪时也返回, 结果里 ready 为 False. 页面就绪得快, 等待时间就短.
+
+浏览器最好使用 page_load_strategy = "eager" (见 crawl.chrome.init_driver):
+driver.get 在 DOMContentLoaded 时就返回, 不必等图片等资源全部加载完.
+
+只抓数据时不需要图片、字体、音视频和第三方统计脚本, 可以选用 RENDER_PROFILES 里的配置:
+    apply_profile_options(options, "data")   # 创建浏览器前: 关闭不需要的功能, 开启网络日志
+    driver = webdriver.Chrome(options=options)
+    apply_profile(driver, "data")            # 创建浏览器后: 通过 DevTools 拦截这些请求
+    render(driver, url); page_traffic(driver)  # 本页传输的字节数和被拦截的请求数
+与 "full" 相比节省的流量和时间用 bench_render.py 测量.
+"""
+import json
+import logging
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+RENDER_BUDGET = 10  # 每个页面最多等待的秒数
+QUIET_MS = 300      # DOM 和网络保持安静多久算就绪
+POLL_MS = 50
+
+# 按资源类型拦截时使用的扩展名 (转换成 DevTools Network.setBlockedURLs 的地址模式)
+BLOCK_TYPE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "mp3", "ogg", "wav", "m3u8"],
+    "stylesheet": ["css"],
+}
+# 常见的第三方统计、广告和社交脚本
+TRACKER_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*connect.facebook.net*", "*hm.baidu.com*", "*cnzz.com*",
+    "*hotjar.com*", "*clarity.ms*",
+]
+# 只抓数据时不需要的浏览器功能
+LEAN_ARGS = [
+    "--blink-settings=imagesEnabled=false",  # 没有扩展名的图片地址也不加载
+    "--autoplay-policy=user-gesture-required",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,InterestFeedContentSuggestions",
+]
+
+# block_types 是 BLOCK_TYPE_EXTENSIONS 的键, block_urls 是额外的地址模式 (* 为通配符), args 是浏览器启动参数;
+# "data" 仍然加载样式表, 依赖可见性的选择器和隐藏元素 (反爬陷阱链接) 的判断不受影响
+RENDER_PROFILES = {
+    "full": {"block_types": [], "block_urls": [], "args": []},
+    "data": {"block_types": ["image", "font", "media"], "block_urls": TRACKER_PATTERNS,
+             "args": LEAN_ARGS},
+    "minimal": {"block_types": ["image", "font", "media", "stylesheet"],
+                "block_urls": TRACKER_PATTERNS, "args": LEAN_ARGS},
+}
+DEFAULT_PROFILE = "data"
+
+# 在每个新页面的脚本执行之前注入, 统计进行中的 fetch/XHR 请求数
+REQUEST_TRACKER_JS = """
+(() => {
+    if (window.__pendingRequests !== undefined) return;
+    window.__pendingRequests = 0;
+    const done = () => { window.__pendingRequests--; };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function (...args) {
+            window.__pendingRequests++;
+            return fetch.apply(this, args).finally(done);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', done, {once: true});
+        return send.apply(this, args);
+    };
+})();
+"""
+
+READY_JS = """
+const [selector, quietMs, budgetMs, pollMs, callback] = arguments;
+const start = performance.now();
+let lastChange = start;
+const observer = new MutationObserver(() => { lastChange = performance.now(); });
+observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+let resources = performance.getEntriesByType('resource').length;
+function check() {
+    const now = performance.now();
+    const count = performance.getEntriesByType('resource').length;
+    if (count !== resources) {
+        resources = count;
+        lastChange = now;
+    }
+    const pending = window.__pendingRequests || 0;
+    const found = selector ? document.querySelector(selector) !== null
+                           : document.readyState === 'complete';
+    const ready = found && pending === 0 && now - lastChange >= quietMs;
+    if (ready || now - start >= budgetMs) {
+        observer.disconnect();
+        callback({ready: ready, found: found, pending_requests: pending,
+                  waited_ms: Math.round(now - start)});
+    } else {
+        setTimeout(check, pollMs);
+    }
+}
+check();
+"""
+
+
+def install_request_tracker(driver):
+    """通过 CDP 在每个新页面里注入请求计数脚本 (仅 Chrome), 成功返回 True"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                               {"source": REQUEST_TRACKER_JS})
+        return True
+    except Exception as e:
+        logger.warning(f"无法注入请求计数脚本, 只按资源加载判断网络是否空闲: {e}")
+        return False
+
+
+def _profile(profile):
+    if isinstance(profile, dict):
+        return profile
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"未知的渲染配置: {profile} (可选 {', '.join(RENDER_PROFILES)})")
+    return RENDER_PROFILES[profile]
+
+
+def blocked_patterns(profile):
+    """配置要拦截的全部地址模式 (模式匹配整个地址, 带查询参数的写法单独列出)"""
+    profile = _profile(profile)
+    patterns = [pattern for kind in profile["block_types"]
+                for ext in BLOCK_TYPE_EXTENSIONS[kind]
+                for pattern in (f"*.{ext}", f"*.{ext}?*")]
+    return patterns + list(profile["block_urls"])
+
+
+def apply_profile_options(options, profile=DEFAULT_PROFILE):
+    """创建浏览器前调用: 加入配置的启动参数, 并开启 DevTools 网络日志供 page_traffic 统计"""
+    for arg in _profile(profile)["args"]:
+        options.add_argument(arg)
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def apply_profile(driver, profile=DEFAULT_PROFILE):
+    """创建浏览器后调用: 通过 DevTools 拦截配置中的请求 (对之后打开的所有页面生效), 返回模式个数"""
+    patterns = blocked_patterns(profile)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logger.warning(f"无法设置请求拦截, 按完整页面加载: {e}")
+        return 0
+    return len(patterns)
+
+
+def page_traffic(driver):
+    """统计上次调用以来 (通常就是刚打开的页面) 的网络流量:
+    {requests, bytes, bytes_by_type, blocked, blocked_by_type}; bytes 是实际传输的字节数 (含响应头)
+
+    需要 apply_profile_options 开启的网络日志, 没有开启时返回 None.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+    types = {}
+    bytes_by_type = Counter()
+    blocked_by_type = Counter()
+    requests = 0
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            types[params["requestId"]] = params.get("type", "Other").lower()
+            requests += 1
+        elif method == "Network.loadingFinished":
+            kind = types.get(params["requestId"], "other")
+            bytes_by_type[kind] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked_by_type[params.get("type", "Other").lower()] += 1
+    return {
+        "requests": requests,
+        "bytes": sum(bytes_by_type.values()),
+        "bytes_by_type": dict(bytes_by_type),
+        "blocked": sum(blocked_by_type.values()),
+        "blocked_by_type": dict(blocked_by_type),
+    }
+
+
+def wait_until_ready(driver, selector=None, budget=RENDER_BUDGET, quiet_ms=QUIET_MS):
+    """等待当前页面就绪, 返回 {ready, found, pending_requests, waited_ms}"""
+    driver.set_script_timeout(budget + 5)
+    status = driver.execute_async_script(READY_JS, selector, quiet_ms, budget * 1000, POLL_MS)
+    if not status["ready"]:
+        logger.warning(f"页面在 {budget}s 内未就绪: {driver.current_url} "
+                       f"(元素{'已' if status['found'] else '未'}出现, "
+                       f"进行中的请求 {status['pending_requests']} 个)")
+    return status
+
+
+def render(driver, url, selector=None, budget=RENDER_BUDGET, quiet_ms=QUIET_MS):
+    """打开页面并等待就绪, 返回就绪状态和总耗时 (秒)"""
+    start = time.perf_counter()
+    driver.set_page_load_timeout(budget)
+    driver.get(url)
+    remaining = max(budget - (time.perf_counter() - start), 0.1)
+    status = wait_until_ready(driver, selector, remaining, quiet_ms)
+    status["elapsed"] = time.perf_counter() - start
+    return status
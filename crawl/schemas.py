@@ -0,0 +1,218 @@
+"""声明式提取模式
+
+一个模式描述列表项选择器和每个字段怎么取值; 产品、新闻、用户各一份模式,
+crawl/targets.py 中的所有 http 目标都用这一套 (见 core):
+    {"selector": "h3"}                            选择器匹配元素的文本
+    {"selector": "a", "attr": "href"}             选择器匹配元素的属性
+    {"label": "价格:", "type": "price"}            "标签: 值" 形式的字段
+    {"label": "规格:", "type": "specs", "keys": [...]}  "CPU 4核, 内存 16GB" 形式的规格
+type 做类型转换: str (默认) / text (多行正文, 去掉换行和每行首尾空白) / int / price / date /
+datetime / url / specs,
+转换失败时取 default (默认 None). anchors 列出不需要输出、但会出现在文本里的其他标签.
+json 给出 JSON 接口记录里对应的键 (默认与字段同名), 含 {...} 时按记录字段格式化,
+from_json 据此把接口数据转换成与 HTML 提取完全相同的记录.
+
+compile_schema 把模式编译成 CompiledSchema: 所有标签合成一个正则,
+每个列表项的文本只扫描一次就切出全部标签字段, 增加字段不会增加对文本的扫描次数.
+编译结果可以 pickle, 直接发送到解析进程 (见 parse_pool).
+"""
+import re
+from urllib.parse import urljoin
+
+from crawl.extraction import ParsedItem
+from crawl.parser_backends import get_backend
+
+PRODUCT = {
+    "item": ".product",
+    "fields": {
+        "name": {"selector": "h3"},
+        "link": {"selector": "a", "attr": "href", "type": "url", "json": "/product/{id}"},
+        "category": {"label": "类别:"},
+        "price": {"label": "价格:", "type": "price"},
+        "specs": {"label": "规格:", "type": "specs", "keys": ["CPU", "内存", "存储"]},
+        "created_at": {"label": "上架时间:", "type": "date"},
+    },
+}
+
+NEWS = {
+    "item": ".news-item",
+    "fields": {
+        "title": {"selector": "h3"},
+        "link": {"selector": "a", "attr": "href", "type": "url", "json": "/news/{id}"},
+        "publish_date": {"label": "日期:", "type": "date"},
+        "author": {"label": "作者:"},
+        "views": {"label": "浏览量:", "type": "int", "default": 0},
+    },
+}
+
+PRODUCT_DETAIL = {
+    "item": ".product",
+    "fields": {
+        "description": {"label": "描述:"},
+    },
+    "anchors": ["类别:", "价格:", "规格:", "上架时间:"],
+}
+
+NEWS_DETAIL = {
+    "item": ".news-item",
+    "fields": {
+        "content": {"selector": "div", "type": "text"},
+    },
+}
+
+USER_DETAIL = {
+    "item": ".user-card",
+    "fields": {
+        "email": {"label": "邮箱:"},
+        "phone": {"label": "电话:"},
+        "last_login": {"label": "最后登录:", "type": "datetime"},
+    },
+    "anchors": ["ID:", "用户名:", "姓名:", "角色:", "部门:", "注册日期:"],
+}
+
+# 各类页面一定会出现的元素 (键为 hybrid.path_pattern), 静态 HTML 里没有时说明内容要靠 JS 渲染
+PAGE_ITEMS = {
+    "/products": PRODUCT["item"],
+    "/product/{id}": PRODUCT_DETAIL["item"],
+    "/news": NEWS["item"],
+    "/news/{id}": NEWS_DETAIL["item"],
+    "/users": "table tbody tr",
+    "/user/{id}": USER_DETAIL["item"],
+}
+
+INT_RE = re.compile(r"-?\d+")
+PRICE_RE = re.compile(r"\d+(?:\.\d+)?")
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+DATETIME_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}(?::\d{2})?)?")
+
+
+def _search(pattern, value):
+    match = pattern.search(value)
+    return match.group() if match else None
+
+
+def _to_int(value):
+    match = _search(INT_RE, value)
+    return int(match) if match is not None else None
+
+
+def _to_price(value):
+    match = _search(PRICE_RE, value.replace(",", ""))
+    return float(match) if match is not None else None
+
+
+def _to_text(value):
+    # 与解析后端取元素文本的方式一致: 各段文本去掉首尾空白后直接拼接
+    return "".join(line.strip() for line in value.splitlines()) or None
+
+
+COERCIONS = {
+    "str": lambda value: value,
+    "text": _to_text,
+    "int": _to_int,
+    "price": _to_price,
+    "date": lambda value: _search(DATE_RE, value),
+    "datetime": lambda value: _search(DATETIME_RE, value),
+}
+
+
+class CompiledSchema:
+    """编译后的模式, 对一个列表项一次性提取出全部字段"""
+
+    def __init__(self, schema, base_url=None):
+        self.item_selector = schema["item"]
+        self.base_url = base_url
+        self.fields = []
+        labels = list(schema.get("anchors", ()))
+        for name, spec in schema["fields"].items():
+            field_type = spec.get("type", "str")
+            if field_type not in COERCIONS and field_type not in ("url", "specs"):
+                raise ValueError(f"字段 {name} 的类型未知: {field_type}")
+            if "label" in spec:
+                labels.append(spec["label"])
+            elif "selector" not in spec:
+                raise ValueError(f"字段 {name} 需要 selector 或 label")
+            self.fields.append((name, spec, field_type))
+        # 长标签优先, 避免 "日期:" 抢先匹配 "注册日期:" 的后半段
+        labels = sorted(set(labels), key=len, reverse=True)
+        self.label_re = re.compile("|".join(map(re.escape, labels))) if labels else None
+
+    def split_labels(self, text):
+        """一次扫描切出 {标签: 值}, 值到下一个标签或 "|" 为止; 标签重复出现时取最后一次"""
+        values = {}
+        if self.label_re is None:
+            return values
+        matches = list(self.label_re.finditer(text))
+        for match, following in zip(matches, matches[1:] + [None]):
+            end = following.start() if following is not None else len(text)
+            values[match.group()] = text[match.end():end].split("|")[0].strip()
+        return values
+
+    def _coerce(self, spec, field_type, value):
+        if value is None or value == "":
+            return spec.get("default")
+        if field_type == "url":
+            return urljoin(self.base_url, value)
+        if field_type == "specs":
+            if isinstance(value, dict):
+                return {key: value.get(key) for key in spec["keys"]}
+            specs = dict.fromkeys(spec["keys"])
+            for part in value.split(","):
+                part = part.strip()
+                for key in spec["keys"]:
+                    if part.startswith(key):
+                        specs[key] = part[len(key):].strip()
+            return specs
+        result = COERCIONS[field_type](value)
+        return spec.get("default") if result is None else result
+
+    def extract(self, item):
+        """从一个 ParsedItem 提取记录"""
+        labels = self.split_labels(item.text)
+        record = {}
+        for name, spec, field_type in self.fields:
+            try:
+                if "label" in spec:
+                    value = labels.get(spec["label"])
+                else:
+                    element = item.select_one(spec["selector"])
+                    if element is None:
+                        value = None
+                    elif "attr" in spec:
+                        value = item.backend.attr(element, spec["attr"])
+                    else:
+                        value = item.backend.text(element)
+                record[name] = self._coerce(spec, field_type, value)
+            except Exception as e:
+                print(f"提取字段 {name} 失败: {e}")
+                record[name] = None
+        return record
+
+    def from_json(self, record):
+        """把 JSON 接口返回的记录转换成与 HTML 提取相同的字段和类型"""
+        result = {}
+        for name, spec, field_type in self.fields:
+            key = spec.get("json", name)
+            value = key.format(**record) if "{" in key else record.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            result[name] = self._coerce(spec, field_type, value)
+        return result
+
+
+def compile_schema(schema, base_url=None):
+    """把模式字典编译成 CompiledSchema, 每次爬取编译一次"""
+    return CompiledSchema(schema, base_url)
+
+
+def extract_records(html, schema, backend=None):
+    """解析整页 HTML, 按模式返回每个列表项的记录"""
+    parser = get_backend(backend)
+    return [schema.extract(ParsedItem(element, parser))
+            for element in parser.select(parser.parse(html), schema.item_selector)]
+
+
+def extract_record(html, schema, backend=None):
+    """解析详情页, 返回第一个匹配项的记录, 没有匹配返回空字典"""
+    records = extract_records(html, schema, backend)
+    return records[0] if records else {}
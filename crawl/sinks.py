@@ -0,0 +1,167 @@
+"""流式输出
+
+NdjsonSink 每行一条 JSON 记录, 每写完一页就 flush 到磁盘, 内存占用不随爬取规模增长.
+写入过程中文件名带 .part 后缀, 正常结束时原子地重命名为正式文件名;
+中途崩溃时 .part 文件里保留已经 flush 的页面. 可选 gzip / zstd 压缩,
+以及按大小轮转成多个分段文件 (每个分段写满后立即原子重命名).
+"""
+import gzip
+import json
+import os
+import zlib
+
+DEFAULT_SINK = "ndjson"
+SINK_FORMATS = ("ndjson", "ndjson.gz", "ndjson.zst", "json")
+
+
+class NdjsonSink:
+    """按页 flush 的 NDJSON 输出
+
+    compression: None / "gzip" / "zstd" (需要安装 zstandard)
+    rotate_bytes: 单个分段的未压缩字节上限, None 表示不轮转
+    """
+
+    def __init__(self, basename, compression=None, rotate_bytes=None):
+        self.basename = basename
+        self.compression = compression
+        self.rotate_bytes = rotate_bytes
+        self.count = 0
+        self.paths = []
+        self._segment = 0
+        self._file = None
+        self._raw = None
+        self._written = 0
+        self.partial_path = None  # 正在写 (或异常结束后保留下来) 的 .part 文件
+
+    @property
+    def path(self):
+        return ", ".join(self.paths) if self.paths else self._final_path()
+
+    def _suffix(self):
+        return {None: "", "gzip": ".gz", "zstd": ".zst"}[self.compression]
+
+    def _final_path(self):
+        if self.rotate_bytes:
+            return f"{self.basename}.{self._segment:05d}.ndjson{self._suffix()}"
+        return f"{self.basename}.ndjson{self._suffix()}"
+
+    def _open(self):
+        self._segment += 1
+        self._written = 0
+        part = self.partial_path = self._final_path() + ".part"
+        if self.compression == "gzip":
+            self._raw = open(part, "wb")
+            self._file = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("zstd 压缩需要安装 zstandard: pip install zstandard")
+            self._raw = open(part, "wb")
+            self._file = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._raw = self._file = open(part, "wb")
+
+    def _flush(self):
+        if self.compression == "gzip":
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+        elif self.compression == "zstd":
+            import zstandard
+            self._file.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._file.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def _finalize(self):
+        """关闭当前分段并原子重命名为正式文件名"""
+        final = self._final_path()
+        self._file.close()
+        if self._raw is not self._file:
+            self._raw.close()
+        os.replace(final + ".part", final)
+        self.paths.append(final)
+        self._file = self._raw = None
+        self.partial_path = None
+
+    def write_page(self, records):
+        """写入一页记录并 flush"""
+        if self._file is None:
+            self._open()
+        for record in records:
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            self._file.write(line)
+            self._written += len(line)
+            self.count += 1
+        self._flush()
+        if self.rotate_bytes and self._written >= self.rotate_bytes:
+            self._finalize()
+
+    def close(self):
+        if self._file is None and not self.paths:
+            self._open()  # 没有数据时也输出一个空文件
+        if self._file is not None:
+            self._finalize()
+
+    def abort(self):
+        """异常结束: 保留已 flush 的 .part 文件, 不重命名"""
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            if self._raw is not self._file:
+                self._raw.close()
+            self._file = self._raw = None
+
+
+class JsonSink:
+    """旧的整体输出格式: 收集全部记录后一次性写成 JSON 数组
+
+    记录只在 close 时写出, 异常结束时不留下任何文件 (partial_path 始终为 None).
+    """
+
+    partial_path = None
+
+    def __init__(self, basename):
+        self.path = f"{basename}.json"
+        self.records = []
+        self.count = 0
+
+    def write_page(self, records):
+        self.records.extend(records)
+        self.count += len(records)
+
+    def close(self):
+        tmp = self.path + ".part"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.records, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def abort(self):
+        pass
+
+
+def open_sink(basename, sink_format=DEFAULT_SINK, rotate_bytes=None):
+    """按格式名创建输出: ndjson / ndjson.gz / ndjson.zst / json"""
+    if sink_format not in SINK_FORMATS:
+        raise ValueError(f"未知的输出格式: {sink_format}, 可选: {', '.join(SINK_FORMATS)}")
+    if sink_format == "json":
+        return JsonSink(basename)
+    compression = {"ndjson": None, "ndjson.gz": "gzip", "ndjson.zst": "zstd"}[sink_format]
+    return NdjsonSink(basename, compression, rotate_bytes)
+
+
+async def drain(pages, sink, on_page=None):
+    """把按页产出记录的异步生成器写入 sink, 返回记录数
+
+    正常结束时关闭 sink (重命名为正式文件); 出错时保留已写入的部分并继续抛出异常.
+    """
+    try:
+        async for records in pages:
+            sink.write_page(records)
+            if on_page is not None:
+                on_page(records)
+    except BaseException:
+        sink.abort()
+        raise
+    sink.close()
+    return sink.count
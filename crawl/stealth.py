@@ -0,0 +1,142 @@
+"""反检测浏览器: undetected_chromedriver + 浏览器池渲染页面 (目标 stealth)"""
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+import random
+import time
+import logging
+import undetected_chromedriver as uc  # 关键修改：使用 uc 的专属配置方式
+
+from crawl.browser_pool import DEFAULT_MAX_PAGES, BrowserPool
+from crawl.rendering import (DEFAULT_PROFILE, RENDER_BUDGET, apply_profile,
+                             apply_profile_options, install_request_tracker, page_traffic,
+                             render)
+
+logger = logging.getLogger(__name__)
+
+class AntiDetectCrawler:
+    """基于浏览器池的反检测爬虫: 浏览器启动后连续处理多个页面, pool_size 个页面并行渲染
+
+    render_mode="ready" 时页面就绪 (ready_selector 出现且 DOM/网络安静) 立即提取, 最多等 budget 秒;
+    "human" 时保持原来的模拟滚动/鼠标/键盘操作和随机停顿, 较慢但更像真人.
+    render_profile 选择拦截哪些资源 (见 rendering.RENDER_PROFILES), 目标站点检查图片/字体是否加载时
+    用 "full".
+    """
+    def __init__(self, pool_size=1, max_pages=DEFAULT_MAX_PAGES, render_mode="ready",
+                 ready_selector=None, budget=RENDER_BUDGET, render_profile=DEFAULT_PROFILE):
+        if render_mode not in ("ready", "human"):
+            raise ValueError(f"未知的渲染方式: {render_mode}")
+        self.render_mode = render_mode
+        self.ready_selector = ready_selector
+        self.budget = budget
+        self.render_profile = render_profile
+        self.pool = BrowserPool(self._init_stealth_driver, size=pool_size, max_pages=max_pages)
+        
+    def _init_stealth_driver(self, port=None, profile_dir=None):
+        """使用 undetected_chromedriver 的专属配置"""
+        options = uc.ChromeOptions()  # 关键修改：使用 uc 提供的 ChromeOptions
+        
+        # 反检测配置（uc 已内置大部分优化，无需手动设置 excludeSwitches）
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        # 每个会话独立的调试端口和用户目录 (uc 会读取这两个参数), 多个浏览器可以同时运行
+        if port:
+            options.add_argument(f"--remote-debugging-port={port}")
+        if profile_dir:
+            options.add_argument(f"--user-data-dir={profile_dir}")
+        if self.render_mode == "ready":
+            options.page_load_strategy = "eager"  # DOMContentLoaded 后即返回, 之后按就绪信号等待
+        apply_profile_options(options, self.render_profile)
+        
+        # 随机用户代理
+        user_agents = [
+            f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{random.randint(90, 120)}.0.{random.randint(1000, 9999)}.{random.randint(100, 999)} Safari/537.36"
+            for _ in range(5)
+        ]
+        options.add_argument(f"user-agent={random.choice(user_agents)}")
+        
+        # 初始化驱动（关键修改：直接使用 uc.Chrome，无需单独配置 Service）
+        driver = uc.Chrome(
+            options=options,
+            version_main=114  # 与 ChromeDriver 主版本一致
+        )
+        if self.render_mode == "ready":
+            install_request_tracker(driver)
+        apply_profile(driver, self.render_profile)
+        return driver
+    
+    def _human_like_interaction(self, driver):
+        """模拟人类交互行为"""
+        # 随机滚动
+        for _ in range(random.randint(2, 5)):
+            scroll_px = random.randint(200, 800)
+            driver.execute_script(f"window.scrollBy(0, {scroll_px})")
+            time.sleep(random.uniform(0.5, 1.5))
+        
+        # 随机鼠标移动
+        actions = ActionChains(driver)
+        for _ in range(random.randint(3, 7)):
+            actions.move_by_offset(random.randint(-50, 50), random.randint(-50, 50)).perform()
+            time.sleep(random.uniform(0.1, 0.3))
+        
+        # 随机键盘操作
+        body = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
+        for _ in range(random.randint(1, 3)):
+            body.send_keys(Keys.PAGE_DOWN)
+            time.sleep(random.uniform(0.2, 0.5))
+    
+    def _render(self, driver, url):
+        """在池中的一个浏览器里渲染页面并提取数据"""
+        logger.info(f"正在访问: {url}")
+        start = time.perf_counter()
+        if self.render_mode == "ready":
+            status = render(driver, url, self.ready_selector, self.budget)
+            ready = status["ready"]
+        else:
+            driver.get(url)
+            self._human_like_interaction(driver)
+            
+            # 确保内容加载
+            WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
+            time.sleep(random.uniform(1, 2))
+            ready = True
+        
+        # 提取数据
+        return {
+            "title": driver.title,
+            "url": driver.current_url,
+            "timestamp": int(time.time()),
+            "ready": ready,
+            "render_seconds": round(time.perf_counter() - start, 3),
+            "traffic": page_traffic(driver)
+        }
+    
+    def crawl_page(self, url):
+        """爬取目标页面"""
+        try:
+            return self.pool.run(url, self._render)
+        except Exception as e:
+            logger.error(f"页面爬取失败: {str(e)}")
+            return None
+    
+    def crawl_many(self, urls):
+        """用池中的浏览器并行爬取多个页面, 按输入顺序返回结果, 失败的页面为 None"""
+        return self.pool.crawl_many(urls, self._render)
+    
+    def close(self):
+        self.pool.close()
+        logger.info("浏览器已关闭")
+
+def crawl_pages(urls, pool_size=1):
+    """用 pool_size 个反检测浏览器并行爬取多个页面, 按输入顺序返回结果, 失败的页面为 None"""
+    crawler = AntiDetectCrawler(pool_size=pool_size)
+    try:
+        return crawler.crawl_many(urls)
+    finally:
+        crawler.close()
@@ -0,0 +1,93 @@
+"""爬取目标: 每个目标是一组配置, 取代原来各自复制一份爬虫代码的脚本
+
+kind 为 "http" 的目标由 crawl.core 按配置抓取产品、新闻、用户三个栏目:
+    headers     "模块:函数" 形式的请求头生成函数 (headers(base_url) -> dict), None 表示不加
+    proxies     代理地址列表, None 表示直连 (每次请求随机选一个)
+    rate/burst/jitter  每个主机的限速起点、突发请求数和令牌间隔的随机抖动 (见 rate_limiter)
+    retries     每个请求最多尝试几次, 失败后降低该主机的速率
+    block_marker  正文里出现这段文字时视为被反爬拦截, 按失败重试
+    warmup      先访问首页建立会话 (获取 cookies 等), 失败时不再继续
+    max_pages   没有总页数、只能跟随下一页链接时的页数上限
+kind 为 "browser" 的目标用浏览器池渲染给定的页面, crawl 为 "模块:函数" 形式的入口
+(crawl(urls, pool_size) -> 每个页面的结果).
+
+这里只有字符串形式的引用, 导入本模块不会导入 aiohttp / selenium / fake_useragent 等依赖.
+"""
+import importlib
+
+BASE_URL = "http://127.0.0.1:5000"
+
+TARGETS = {
+    # 原 spider.py
+    "spider": {
+        "description": "并发 HTTP 爬虫",
+        "kind": "http",
+        "rate": 10,
+    },
+    # 原 crawler-User-Agent.py
+    "user-agent": {
+        "description": "并发 HTTP 爬虫, 每个请求随机 User-Agent",
+        "kind": "http",
+        "rate": 10,
+        "headers": "crawl.headers:random_headers",
+    },
+    # 原 anti_anti_crawler.py (需要 pip install fake-useragent)
+    "anti": {
+        "description": "低速、随机请求头和代理、失败重试的反反爬 HTTP 爬虫",
+        "kind": "http",
+        "rate": 2,
+        "burst": 3,
+        "jitter": 1.0,
+        "headers": "crawl.headers:fake_headers",
+        "proxies": [None],  # 直连; 实际使用时加入有效代理, 例如 "http://proxy1.example.com:8080"
+        "retries": 3,
+        "block_marker": "检测到异常请求",  # 根据实际网站调整
+        "warmup": True,
+        "max_pages": 500,
+    },
+    # 原 chromedriver-test.py
+    "chrome": {
+        "description": "Chrome 浏览器池渲染页面",
+        "kind": "browser",
+        "crawl": "crawl.chrome:crawl_data",
+        "paths": ["/"] + [f"/products?page={page}" for page in range(1, 7)],
+    },
+    # 原 bypass-js-spider.py (需要 pip install undetected-chromedriver)
+    "stealth": {
+        "description": "undetected_chromedriver 反检测浏览器渲染页面",
+        "kind": "browser",
+        "crawl": "crawl.stealth:crawl_pages",
+        "paths": ["/"],
+    },
+}
+
+# http 目标未配置的项取这些默认值
+HTTP_DEFAULTS = {
+    "concurrency": 20,
+    "per_host": 8,
+    "rate": 10,
+    "burst": None,  # None 表示 rate 向上取整 (至少为 1)
+    "jitter": 0.0,
+    "headers": None,
+    "proxies": None,
+    "retries": 1,
+    "block_marker": None,
+    "warmup": False,
+    "max_pages": None,
+}
+
+
+def get_target(name):
+    """按名字取目标配置, http 目标补齐默认值"""
+    if name not in TARGETS:
+        raise ValueError(f"未知的爬取目标: {name}, 可选: {', '.join(TARGETS)}")
+    target = dict(TARGETS[name], name=name)
+    if target["kind"] == "http":
+        target = {**HTTP_DEFAULTS, **target}
+    return target
+
+
+def load(ref):
+    """导入 "模块:名字" 形式的引用"""
+    module, _, attr = ref.partition(":")
+    return getattr(importlib.import_module(module), attr)
@@ -0,0 +1,418 @@
+"""测试站点的合成数据生成
+
+按批生成产品/新闻/用户记录: 每个字段整批调用一次 rng.choices, 日期预先算好查找表,
+百万级记录也能在几秒内生成. 每一批使用由 (seed, 表名, 批号) 派生的独立随机数发生器,
+给定 seed 和 reference (日期基准) 时结果完全可复现, 与批大小以外的参数无关.
+
+表对象 (MemoryTable / SqliteTable) 按 id 和 INDEXED_FIELDS 中的字段建立索引,
+详情页按 id 查找和列表页按字段筛选都不需要扫描整张表, 增删改时索引同步更新.
+
+数据也可以一次性写入 SQLite 文件 (SqliteStore), 之后按需分页读取, 不必全部载入内存:
+    python dataset.py --products 1000000 --news 200000 --users 50000 --seed 1 --out dataset.db
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+BATCH_SIZE = 10000
+
+# 列表页可以按这些字段筛选, 为它们建立二级索引
+INDEXED_FIELDS = {
+    "products": ("category",),
+    "news": ("author",),
+    "users": ("department",),
+}
+
+CATEGORIES = ["云计算", "服务器", "数据库", "存储", "网络", "安全"]
+CPU_CORES = [2, 4, 8, 16]
+MEMORY_GB = [8, 16, 32, 64]
+STORAGE_GB = [100, 200, 500, 1000]
+NEWS_TYPES = ["产品发布", "优惠活动", "技术分享", "行业动态"]
+NEWS_TOPICS = ["云计算", "人工智能", "大数据", "物联网", "区块链"]
+NEWS_ADJECTIVES = ["重磅", "最新", "独家"]
+NEWS_ANGLES = ["技术突破", "市场趋势", "应用案例"]
+AUTHORS = ["华为云官方", "技术专家", "市场部", "行业分析师"]
+FIRST_NAMES = ["张", "王", "李", "赵", "刘"]
+LAST_NAMES = ["伟", "芳", "娜", "秀英", "强", "洋"]
+ROLES = ["管理员", "普通用户", "VIP用户", "测试用户"]
+DEPARTMENTS = ["技术部", "市场部", "销售部", "产品部", "客服部"]
+
+
+def _rng(seed, table, batch):
+    """每一批独立的随机数发生器, seed 为 None 时不可复现"""
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{table}:{batch}")
+
+
+def _dates(reference, first, last, fmt="%Y-%m-%d"):
+    """reference 往前 first..last 天的日期字符串查找表"""
+    return [(reference - timedelta(days=days)).strftime(fmt) for days in range(first, last + 1)]
+
+
+def _batches(count, batch_size):
+    for batch, start in enumerate(range(0, count, batch_size)):
+        yield batch, start + 1, min(batch_size, count - start)
+
+
+def generate_products(count, seed=None, reference=None, batch_size=BATCH_SIZE):
+    """按批产出产品记录 (每批一个列表)"""
+    reference = reference or datetime.now()
+    created = _dates(reference, 1, 365)
+    for batch, first_id, n in _batches(count, batch_size):
+        rng = _rng(seed, "products", batch)
+        names = rng.choices(CATEGORIES, k=n)
+        categories = rng.choices(CATEGORIES, k=n)
+        cpus = rng.choices(CPU_CORES, k=n)
+        memories = rng.choices(MEMORY_GB, k=n)
+        storages = rng.choices(STORAGE_GB, k=n)
+        descriptions = rng.choices(CATEGORIES, k=n)
+        dates = rng.choices(created, k=n)
+        yield [{
+            "id": first_id + i,
+            "name": f"{names[i]}服务{first_id + i}",
+            "category": categories[i],
+            "price": round(rng.uniform(100, 5000), 2),
+            "specs": {
+                "CPU": f"{cpus[i]}核",
+                "内存": f"{memories[i]}GB",
+                "存储": f"{storages[i]}GB SSD"
+            },
+            "description": f"这是{descriptions[i]}类产品的详细描述，适用于各种企业场景",
+            "created_at": dates[i]
+        } for i in range(n)]
+
+
+def generate_news(count, seed=None, reference=None, batch_size=BATCH_SIZE):
+    """按批产出新闻记录"""
+    reference = reference or datetime.now()
+    published = _dates(reference, 1, 60)
+    for batch, first_id, n in _batches(count, batch_size):
+        rng = _rng(seed, "news", batch)
+        types = rng.choices(NEWS_TYPES, k=n)
+        title_topics = rng.choices(NEWS_TOPICS, k=n)
+        adjectives = rng.choices(NEWS_ADJECTIVES, k=n)
+        topics = rng.choices(NEWS_TOPICS, k=n)
+        angles = rng.choices(NEWS_ANGLES, k=n)
+        dates = rng.choices(published, k=n)
+        authors = rng.choices(AUTHORS, k=n)
+        views = rng.choices(range(100, 5001), k=n)
+        yield [{
+            "id": first_id + i,
+            "title": f"{types[i]}：关于{title_topics[i]}的{adjectives[i]}消息",
+            "content": f"这里是新闻{first_id + i}的详细内容。本次新闻主要关于{topics[i]}领域的发展，"
+                       f"详细介绍了{angles[i]}。\n\n更多详情请关注我们的官方公告。",
+            "publish_date": dates[i],
+            "author": authors[i],
+            "views": views[i]
+        } for i in range(n)]
+
+
+def generate_users(count, seed=None, reference=None, batch_size=BATCH_SIZE):
+    """按批产出用户记录"""
+    reference = reference or datetime.now()
+    registered = _dates(reference, 30, 365)
+    logins = _dates(reference, 0, 30, "%Y-%m-%d %H:%M:%S")
+    for batch, first_id, n in _batches(count, batch_size):
+        rng = _rng(seed, "users", batch)
+        first_names = rng.choices(FIRST_NAMES, k=n)
+        last_names = rng.choices(LAST_NAMES, k=n)
+        phones = rng.choices(range(10000000, 100000000), k=n)
+        roles = rng.choices(ROLES, k=n)
+        departments = rng.choices(DEPARTMENTS, k=n)
+        register_dates = rng.choices(registered, k=n)
+        last_logins = rng.choices(logins, k=n)
+        yield [{
+            "id": first_id + i,
+            "username": f"user{first_id + i}",
+            "name": f"{first_names[i]}{last_names[i]}",
+            "email": f"user{first_id + i}@example.com",
+            "phone": f"138{phones[i]}",
+            "role": roles[i],
+            "department": departments[i],
+            "register_date": register_dates[i],
+            "last_login": last_logins[i]
+        } for i in range(n)]
+
+
+GENERATORS = {
+    "products": generate_products,
+    "news": generate_news,
+    "users": generate_users,
+}
+
+
+def generate(table, count, seed=None, reference=None, batch_size=BATCH_SIZE):
+    """一次性生成整张表, 返回记录列表"""
+    records = []
+    for batch in GENERATORS[table](count, seed, reference, batch_size):
+        records.extend(batch)
+    return records
+
+
+def _record_id(record):
+    return record["id"]
+
+
+class MemoryTable:
+    """内存中的一张表, 像列表一样使用 (len / 下标 / 切片 / 迭代), 记录按 id 排序
+
+    by_id 是 id 索引, indexes 是 {字段: {值: 按 id 排序的记录列表}} 二级索引,
+    通过 insert / update / delete 修改时同步维护.
+    """
+
+    def __init__(self, records, indexed=()):
+        self.records = sorted(records, key=_record_id)
+        self.by_id = {record["id"]: record for record in self.records}
+        self.indexes = {field: {} for field in indexed}
+        for record in self.records:
+            self._index(record)
+
+    def _index(self, record):
+        for field, index in self.indexes.items():
+            bisect.insort(index.setdefault(record.get(field), []), record, key=_record_id)
+
+    def _unindex(self, record):
+        for field, index in self.indexes.items():
+            bucket = index[record.get(field)]
+            del bucket[bisect.bisect_left(bucket, record["id"], key=_record_id)]
+            if not bucket:
+                del index[record.get(field)]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, record_id):
+        """按 id 取一条记录, 不存在返回 None"""
+        return self.by_id.get(record_id)
+
+    def filter(self, field, value):
+        """字段等于 value 的记录 (按 id 排序); 没有索引的字段退化为全表扫描"""
+        if field in self.indexes:
+            return self.indexes[field].get(value, [])
+        return [record for record in self.records if record.get(field) == value]
+
+    def after(self, cursor, limit, where=None):
+        """游标分页: id 大于 cursor 的前 limit 条记录, where 为 (字段, 值) 时先筛选"""
+        records = self.filter(*where) if where is not None else self.records
+        start = bisect.bisect_right(records, cursor, key=_record_id)
+        return records[start:start + limit]
+
+    def insert(self, record):
+        """插入一条记录, 没有 id 时分配最大 id + 1, 返回记录"""
+        if "id" not in record:
+            record["id"] = self.records[-1]["id"] + 1 if self.records else 1
+        if record["id"] in self.by_id:
+            raise ValueError(f"id {record['id']} 已存在")
+        bisect.insort(self.records, record, key=_record_id)
+        self.by_id[record["id"]] = record
+        self._index(record)
+        return record
+
+    def update(self, record_id, changes):
+        """修改一条记录的字段 (id 不可修改), 返回修改后的记录"""
+        record = self.by_id[record_id]
+        self._unindex(record)
+        record.update({k: v for k, v in changes.items() if k != "id"})
+        self._index(record)
+        return record
+
+    def delete(self, record_id):
+        record = self.by_id.pop(record_id)
+        self._unindex(record)
+        del self.records[bisect.bisect_left(self.records, record_id, key=_record_id)]
+
+
+class SqliteTable:
+    """SQLite 中的一张表 (或按字段筛选后的视图), 接口与 MemoryTable 相同, 按需读取
+
+    id 是主键, INDEXED_FIELDS 中的字段有表达式索引; 每个线程使用自己的连接,
+    可以在多线程服务器里直接使用.
+    """
+
+    def __init__(self, store, name, indexed=(), where=None):
+        self.store = store
+        self.name = name
+        self.indexed = indexed
+        self._where = where  # (字段, 值) 或 None
+        self._len = None
+
+    def _query(self, sql, params=()):
+        return self.store.connection().execute(sql, params)
+
+    def _condition(self, prefix):
+        """筛选条件 (" WHERE ..." / " AND ...") 和参数, 没有筛选时为空"""
+        if self._where is None:
+            return "", ()
+        field, value = self._where
+        return f" {prefix} json_extract(data, '$.{field}') = ?", (value,)
+
+    def __len__(self):
+        if self._len is None:
+            where, params = self._condition("WHERE")
+            (self._len,) = self._query(f"SELECT COUNT(*) FROM {self.name}{where}", params).fetchone()
+        return self._len
+
+    def _rows(self, limit, offset):
+        where, params = self._condition("WHERE")
+        return self._query(f"SELECT data FROM {self.name}{where} ORDER BY id LIMIT ? OFFSET ?",
+                           (*params, limit, offset))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if stop <= start:
+                return []
+            return [json.loads(data) for (data,) in self._rows(stop - start, start)][::step]
+        if index < 0:
+            index += len(self)
+        row = self._rows(1, index).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return json.loads(row[0])
+
+    def __iter__(self):
+        last_id = 0
+        while True:
+            records = self.after(last_id, BATCH_SIZE)
+            if not records:
+                return
+            yield from records
+            last_id = records[-1]["id"]
+
+    def get(self, record_id):
+        """按 id 取一条记录, 不存在返回 None"""
+        row = self._query(f"SELECT data FROM {self.name} WHERE id = ?", (record_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def filter(self, field, value):
+        """字段等于 value 的记录视图, 有索引的字段走表达式索引"""
+        return SqliteTable(self.store, self.name, self.indexed, (field, value))
+
+    def after(self, cursor, limit, where=None):
+        """游标分页: id 大于 cursor 的前 limit 条记录, 走主键索引, 与页码深度无关"""
+        if where is not None:
+            return self.filter(*where).after(cursor, limit)
+        condition, params = self._condition("AND")
+        rows = self._query(
+            f"SELECT data FROM {self.name} WHERE id > ?{condition} ORDER BY id LIMIT ?",
+            (cursor, *params, limit))
+        return [json.loads(data) for (data,) in rows]
+
+    def _write(self, sql, params):
+        conn = self.store.connection()
+        with conn:
+            conn.execute(sql, params)
+        self._len = None
+
+    def insert(self, record):
+        if "id" not in record:
+            (max_id,) = self._query(f"SELECT COALESCE(MAX(id), 0) FROM {self.name}").fetchone()
+            record["id"] = max_id + 1
+        try:
+            self._write(f"INSERT INTO {self.name} (id, data) VALUES (?, ?)",
+                        (record["id"], json.dumps(record, ensure_ascii=False)))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"id {record['id']} 已存在")
+        return record
+
+    def update(self, record_id, changes):
+        record = self.get(record_id)
+        if record is None:
+            raise KeyError(record_id)
+        record.update({k: v for k, v in changes.items() if k != "id"})
+        self._write(f"UPDATE {self.name} SET data = ? WHERE id = ?",
+                    (json.dumps(record, ensure_ascii=False), record_id))
+        return record
+
+    def delete(self, record_id):
+        if self.get(record_id) is None:
+            raise KeyError(record_id)
+        self._write(f"DELETE FROM {self.name} WHERE id = ?", (record_id,))
+
+
+class SqliteStore:
+    """保存生成数据的 SQLite 文件
+
+    文件不存在或生成参数变化时重新生成, 否则直接打开, 不读入任何记录.
+    """
+
+    def __init__(self, path, counts, seed=None, reference=None, batch_size=BATCH_SIZE):
+        self.path = path
+        self._local = threading.local()
+        meta = {"counts": counts, "seed": seed,
+                "reference": reference.isoformat() if reference else None}
+        if self._meta() != meta:
+            self._build(meta, counts, seed, reference, batch_size)
+        conn = self.connection()
+        with conn:
+            for name in counts:
+                for field in INDEXED_FIELDS.get(name, ()):
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_{field} "
+                                 f"ON {name} (json_extract(data, '$.{field}'))")
+        self.tables = {name: SqliteTable(self, name, INDEXED_FIELDS.get(name, ()))
+                       for name in counts}
+
+    def connection(self):
+        # 每个线程一个连接; fork 出的子进程 (多进程服务) 不沿用父进程的连接
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = sqlite3.connect(self.path)
+            self._local.pid = os.getpid()
+        return conn
+
+    def _meta(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            row = self.connection().execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _build(self, meta, counts, seed, reference, batch_size):
+        print(f"生成测试数据到 {self.path} ...")
+        start = time.perf_counter()
+        conn = self.connection()
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS meta")
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            for name, count in counts.items():
+                conn.execute(f"DROP TABLE IF EXISTS {name}")
+                conn.execute(f"CREATE TABLE {name} (id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+                for batch in GENERATORS[name](count, seed, reference, batch_size):
+                    conn.executemany(
+                        f"INSERT INTO {name} (id, data) VALUES (?, ?)",
+                        ((r["id"], json.dumps(r, ensure_ascii=False)) for r in batch))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('params', ?)", (json.dumps(meta),))
+        print(f"生成完成, 用时 {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成测试站点数据")
+    parser.add_argument("--products", type=int, default=30)
+    parser.add_argument("--news", type=int, default=20)
+    parser.add_argument("--users", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--reference", type=datetime.fromisoformat, default=None,
+                        help="日期基准, 例如 2026-01-01; 默认为当前时间")
+    parser.add_argument("--out", default="dataset.db")
+    args = parser.parse_args()
+    SqliteStore(args.out, {"products": args.products, "news": args.news, "users": args.users},
+                args.seed, args.reference)
+
+
+if __name__ == '__main__':
+    main()
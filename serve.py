@@ -0,0 +1,147 @@
+"""测试站点的生产模式启动器 (多进程, 用于高并发压测)
+
+server_web.py 直接运行时是单进程的 Werkzeug 开发服务器 (带调试器). 这里先在主进程里生成一次数据
+(Database 预加载), 再 fork 出多个工作进程共享这份数据 (写时复制), 各进程数据和 ETag 完全一致.
+每个工作进程用线程处理请求, 响应按客户端的 Accept-Encoding 压缩.
+
+安装了 gunicorn 时使用 gunicorn (gthread 工作进程, preload_app, 支持 HTTP/1.1 keep-alive),
+否则使用内置的预先 fork 的 Werkzeug 服务器 (Werkzeug 每个响应后都关闭连接, 不支持 keep-alive).
+注意: 运行期间通过 Database.insert 等修改数据只在 --workers 1 时安全. 版本号和 Last-Modified
+(Database.version / last_modified)、页面缓存 (PageCache) 和 ETag 都在各工作进程内部,
+即使用 --store 把数据放在同一个 SQLite 文件中, 其他工作进程也不知道数据变了, 会继续返回旧页面
+和旧的 ETag (客户端收到 304).
+
+用法: python serve.py --workers 8 --products 100000 --news 50000 --users 5000 --seed 1
+"""
+import argparse
+import importlib.util
+import os
+import signal
+import sys
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import server_web
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_THREADS = 8
+KEEPALIVE = 75  # 空闲的 keep-alive 连接保持的秒数 (gunicorn)
+BACKLOG = 2048  # 监听队列长度, 压测时大量连接同时到达
+
+
+class RequestHandler(WSGIRequestHandler):
+    """内置服务器的请求处理: 默认不输出每个请求的访问日志"""
+    access_log = False
+
+    def log_request(self, *args, **kwargs):
+        if self.access_log:
+            super().log_request(*args, **kwargs)
+
+
+def serve_gunicorn(app, host, port, workers, threads, keepalive, access_log):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "gthread")  # keep-alive 需要线程或异步工作进程
+            self.cfg.set("threads", threads)
+            self.cfg.set("keepalive", keepalive)
+            self.cfg.set("backlog", BACKLOG)
+            self.cfg.set("preload_app", True)
+            if access_log:
+                self.cfg.set("accesslog", "-")
+
+        def load(self):
+            return app
+
+    Application().run()
+
+
+def serve_prefork(app, host, port, workers, access_log):
+    """内置的多进程服务器: 主进程监听端口, 工作进程共享监听套接字各自接受连接"""
+    handler = type("RequestHandler", (RequestHandler,), {"access_log": access_log})
+    server = make_server(host, port, app, threaded=True, request_handler=handler)
+    server.socket.listen(BACKLOG)
+
+    def start_worker():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        return pid
+
+    children = {start_worker() for _ in range(workers)}
+    print(f"{workers} 个工作进程已启动: http://{host}:{server.server_port}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            # 工作进程意外退出时补一个新的
+            print(f"工作进程 {pid} 退出 (状态 {status}), 重新启动")
+            children.add(start_worker())
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测试站点的生产模式启动器")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS,
+                        help="gunicorn 每个工作进程的线程数 (内置服务器每个请求一个线程)")
+    parser.add_argument("--keepalive", type=int, default=KEEPALIVE,
+                        help="gunicorn 空闲连接保持的秒数")
+    parser.add_argument("--server", choices=("auto", "gunicorn", "prefork"), default="auto")
+    parser.add_argument("--no-compress", action="store_true", help="不压缩响应")
+    parser.add_argument("--access-log", action="store_true")
+    parser.add_argument("--products", type=int, default=30)
+    parser.add_argument("--news", type=int, default=20)
+    parser.add_argument("--users", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=None, help="固定随机种子, 数据可复现")
+    parser.add_argument("--store", default=None, help="把数据保存在 SQLite 文件中按需读取")
+    args = parser.parse_args()
+
+    # 数据只在主进程生成一次, 工作进程 fork 后直接共享
+    server_web.db = server_web.Database(products=args.products, news=args.news, users=args.users,
+                                        seed=args.seed, store=args.store)
+    if args.no_compress:
+        server_web.COMPRESS_ENCODINGS = ()
+
+    use_gunicorn = args.server == "gunicorn" or (
+        args.server == "auto" and importlib.util.find_spec("gunicorn") is not None)
+    if use_gunicorn:
+        # gunicorn 会解析自己的命令行参数
+        sys.argv = sys.argv[:1]
+        serve_gunicorn(server_web.app, args.host, args.port, args.workers, args.threads,
+                       args.keepalive, args.access_log)
+    else:
+        serve_prefork(server_web.app, args.host, args.port, args.workers, args.access_log)
+
+
+if __name__ == '__main__':
+    main()
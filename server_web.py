@@ -1,69 +1,61 @@
-from flask import Flask, render_template_string, request
-import random
-from datetime import datetime, timedelta
+from flask import Flask, jsonify, request
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from dataset import INDEXED_FIELDS, MemoryTable, SqliteStore, generate
+
+try:
+    import brotli
+except ImportError:  # 可选依赖, 没有安装时只用 gzip
+    brotli = None
 
 app = Flask(__name__)
+app.json.ensure_ascii = False  # JSON 接口直接输出中文, 体积更小
 
 # 模拟数据库
 class Database:
-    def __init__(self):
-        self.products = self._generate_products()
-        self.news = self._generate_news()
-        self.users = self._generate_users()
+    """测试站点数据
+
+    seed / reference 固定时生成的数据可复现 (见 dataset);
+    store 为 SQLite 文件路径时数据保存在文件中按需读取, 适合百万级规模.
+    每张表都有 id 索引和 INDEXED_FIELDS 二级索引; 通过 insert / update / delete 修改数据,
+    索引随之更新, 并调用 touch 使客户端缓存失效.
+    """
+    def __init__(self, products=30, news=20, users=15, seed=None, reference=None, store=None):
+        counts = {"products": products, "news": news, "users": users}
+        if store:
+            tables = SqliteStore(store, counts, seed, reference).tables
+        else:
+            tables = {name: MemoryTable(generate(name, count, seed, reference), INDEXED_FIELDS[name])
+                      for name, count in counts.items()}
+        self.products = tables["products"]
+        self.news = tables["news"]
+        self.users = tables["users"]
+        self.touch()
     
-    def _generate_products(self):
-        categories = ["云计算", "服务器", "数据库", "存储", "网络", "安全"]
-        products = []
-        for i in range(1, 31):
-            products.append({
-                "id": i,
-                "name": f"{random.choice(categories)}服务{i}",
-                "category": random.choice(categories),
-                "price": round(random.uniform(100, 5000), 2),
-                "specs": {
-                    "CPU": f"{random.choice([2,4,8,16])}核",
-                    "内存": f"{random.choice([8,16,32,64])}GB",
-                    "存储": f"{random.choice([100,200,500,1000])}GB SSD"
-                },
-                "description": f"这是{random.choice(categories)}类产品的详细描述，适用于各种企业场景",
-                "created_at": (datetime.now() - timedelta(days=random.randint(1, 365))).strftime("%Y-%m-%d")
-            })
-        return products
+    def touch(self):
+        """数据变更后调用: 更新版本号和最后修改时间, 使客户端缓存失效"""
+        self.version = getattr(self, 'version', 0) + 1
+        # HTTP 日期只精确到秒
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
     
-    def _generate_news(self):
-        news_types = ["产品发布", "优惠活动", "技术分享", "行业动态"]
-        news_topics = ["云计算", "人工智能", "大数据", "物联网", "区块链"]
-        news = []
-        for i in range(1, 21):
-            news.append({
-                "id": i,
-                "title": f"{random.choice(news_types)}：关于{random.choice(news_topics)}的{random.choice(['重磅', '最新', '独家'])}消息",
-                "content": f"这里是新闻{i}的详细内容。本次新闻主要关于{random.choice(news_topics)}领域的发展，详细介绍了{random.choice(['技术突破', '市场趋势', '应用案例'])}。\n\n更多详情请关注我们的官方公告。",
-                "publish_date": (datetime.now() - timedelta(days=random.randint(1, 60))).strftime("%Y-%m-%d"),
-                "author": random.choice(["华为云官方", "技术专家", "市场部", "行业分析师"]),
-                "views": random.randint(100, 5000)
-            })
-        return news
+    def insert(self, table, record):
+        record = getattr(self, table).insert(record)
+        self.touch()
+        return record
     
-    def _generate_users(self):
-        first_names = ["张", "王", "李", "赵", "刘"]
-        last_names = ["伟", "芳", "娜", "秀英", "强", "洋"]
-        roles = ["管理员", "普通用户", "VIP用户", "测试用户"]
-        departments = ["技术部", "市场部", "销售部", "产品部", "客服部"]
-        users = []
-        for i in range(1, 16):
-            users.append({
-                "id": i,
-                "username": f"user{i}",
-                "name": f"{random.choice(first_names)}{random.choice(last_names)}",
-                "email": f"user{i}@example.com",
-                "phone": f"138{random.randint(1000,9999)}{random.randint(1000,9999)}",
-                "role": random.choice(roles),
-                "department": random.choice(departments),
-                "register_date": (datetime.now() - timedelta(days=random.randint(30, 365))).strftime("%Y-%m-%d"),
-                "last_login": (datetime.now() - timedelta(days=random.randint(0, 30))).strftime("%Y-%m-%d %H:%M:%S")
-            })
-        return users
+    def update(self, table, record_id, **changes):
+        record = getattr(self, table).update(record_id, changes)
+        self.touch()
+        return record
+    
+    def delete(self, table, record_id):
+        getattr(self, table).delete(record_id)
+        self.touch()
 
 db = Database()
 
@@ -110,13 +102,150 @@ BASE_TEMPLATE = '''
 </html>
 '''
 
-def render_page(content, **context):
+def page_etag():
+    """当前请求页面的 ETag: 由数据版本和请求路径决定, 无需渲染页面即可计算"""
+    key = f"{db.last_modified.timestamp()}:{db.version}:{request.full_path}"
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+def set_validators(response):
+    """200 和 304 响应带同样的校验器. ETag 总是弱 ETag: 同一页面按 Accept-Encoding
+    可能压缩也可能不压缩, 304 时还不知道 200 会不会被压缩, 只有弱 ETag 对两种编码都成立"""
+    response.set_etag(page_etag(), weak=True)
+    response.last_modified = db.last_modified
+    return response
+
+@app.before_request
+def check_not_modified():
+    """条件请求: 数据未变化时直接返回 304, 不再渲染页面"""
+    if request.method != 'GET':
+        return None
+    if request.if_none_match:
+        # 页面的 ETag 是弱 ETag, 按弱比较匹配
+        not_modified = request.if_none_match.contains_weak(page_etag())
+    elif request.if_modified_since:
+        not_modified = request.if_modified_since >= db.last_modified
+    else:
+        return None
+    if not_modified:
+        response = set_validators(app.response_class(status=304))
+        # 304 要带上 200 响应会带的 Vary (页面都是可压缩的类型, 见 compress_response)
+        response.vary.add('Accept-Encoding')
+        return response
+    return None
+
+class PageCache:
+    """渲染结果缓存: 按请求路径 (路由 + 页码 + 筛选参数) 缓存 200 响应的正文和类型,
+    以及按 (路径, 编码) 缓存压缩后的正文;
+    数据版本变化 (Database.touch) 时整体失效; max_entries 为 0 时不缓存"""
+    
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.version = None
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key, version):
+        with self.lock:
+            if version != self.version:
+                self.pages.clear()
+                self.version = version
+                return None
+            page = self.pages.get(key)
+            if page is not None:
+                self.pages.move_to_end(key)
+            return page
+    
+    def put(self, key, version, page):
+        if not self.max_entries:
+            return
+        with self.lock:
+            if version != self.version:
+                return
+            self.pages[key] = page
+            if len(self.pages) > self.max_entries:
+                self.pages.popitem(last=False)
+
+page_cache = PageCache()
+
+@app.before_request
+def serve_cached_page():
+    """命中渲染缓存时直接返回, 不再查询数据和渲染模板"""
+    if request.method != 'GET' or not page_cache.max_entries:
+        return None
+    # 记下渲染前的数据版本, 渲染期间数据被修改时不会把旧页面存成新版本
+    request.environ['page_cache.version'] = db.version
+    page = page_cache.get(request.full_path, db.version)
+    if page is None:
+        return None
+    request.environ['page_cache.hit'] = True
+    body, mimetype = page
+    return app.response_class(body, mimetype=mimetype)
+
+# 响应压缩: 客户端接受时用 brotli (已安装时) 或 gzip 压缩 HTML 和 JSON 正文
+COMPRESS_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESS_MIMETYPES = ("text/html", "application/json")
+COMPRESS_MIN_SIZE = 500  # 字节, 更小的正文压缩后基本不会变小
+COMPRESS_LEVELS = {"br": 5, "gzip": 6}
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESS_LEVELS["br"])
+    return gzip.compress(body, compresslevel=COMPRESS_LEVELS["gzip"], mtime=0)
+
+# after_request 钩子按注册的相反顺序执行: 压缩在 add_validators 和 cache_page 之后进行,
+# 渲染缓存里保存未压缩的正文, 压缩结果另外按编码缓存
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(COMPRESS_ENCODINGS)
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        return response
+    version = request.environ.get('page_cache.version')
+    key = (request.full_path, encoding)
+    compressed = page_cache.get(key, version) if version is not None else None
+    if compressed is None:
+        compressed = compress(body, encoding)
+        if version is not None:
+            page_cache.put(key, version, compressed)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.after_request
+def cache_page(response):
+    version = request.environ.get('page_cache.version')
+    if (version is not None and response.status_code == 200
+            and not request.environ.get('page_cache.hit')):
+        page_cache.put(request.full_path, version, (response.get_data(), response.mimetype))
+    return response
+
+@app.after_request
+def add_validators(response):
+    if request.method == 'GET' and response.status_code == 200:
+        set_validators(response)
+    return response
+
+def compile_page(content):
+    """启动时把基础模板和页面内容编译成一个模板, 之后每次请求直接渲染"""
+    return app.jinja_env.from_string(BASE_TEMPLATE + content)
+
+def render_page(template, **context):
     """渲染页面辅助函数"""
-    return render_template_string(BASE_TEMPLATE + content, **context)
+    return template.render(**context)
 
-@app.route('/')
-def index():
-    content = '''
+def filtered(table, field):
+    """列表页按 ?field=值 筛选 (走二级索引), 返回 (记录, 分页链接要带上的查询串)"""
+    value = request.args.get(field)
+    if not value:
+        return table, ""
+    return table.filter(field, value), "&" + urlencode({field: value})
+
+INDEX_TEMPLATE = compile_page('''
     <h2>欢迎来到测试平台</h2>
     <p>这是一个用于爬虫练习的模拟云计算服务平台</p>
     
@@ -141,17 +270,13 @@ def index():
         {% endfor %}
         <p><a href="/news">查看所有新闻 →</a></p>
     </div>
-    '''
-    return render_page(content, products=db.products, news=db.news)
+''')
 
-@app.route('/products')
-def product_list():
-    page = request.args.get('page', 1, type=int)
-    per_page = 5
-    total_pages = (len(db.products) + per_page - 1) // per_page
-    paginated_products = db.products[(page-1)*per_page : page*per_page]
-    
-    content = '''
+@app.route('/')
+def index():
+    return render_page(INDEX_TEMPLATE, products=db.products, news=db.news)
+
+PRODUCT_LIST_TEMPLATE = compile_page('''
     <h2>产品列表</h2>
     {% for p in products %}
     <div class="product">
@@ -164,26 +289,30 @@ def product_list():
     
     <div class="pagination">
         {% if page > 1 %}
-            <a href="/products?page={{ page-1 }}">上一页</a>
+            <a href="/products?page={{ page-1 }}{{ filter_query }}">上一页</a>
         {% endif %}
         第 {{ page }} 页/共 {{ total_pages }} 页
         {% if page < total_pages %}
-            <a href="/products?page={{ page+1 }}">下一页</a>
+            <a href="/products?page={{ page+1 }}{{ filter_query }}">下一页</a>
         {% endif %}
     </div>
-    '''
-    return render_page(content, 
+''')
+
+@app.route('/products')
+def product_list():
+    page = request.args.get('page', 1, type=int)
+    per_page = 5
+    products, filter_query = filtered(db.products, 'category')
+    total_pages = (len(products) + per_page - 1) // per_page
+    paginated_products = products[(page-1)*per_page : page*per_page]
+    
+    return render_page(PRODUCT_LIST_TEMPLATE, 
                      products=paginated_products, 
                      page=page, 
-                     total_pages=total_pages)
+                     total_pages=total_pages,
+                     filter_query=filter_query)
 
-@app.route('/product/<int:id>')
-def product_detail(id):
-    product = next((p for p in db.products if p['id'] == id), None)
-    if not product:
-        return "产品不存在", 404
-    
-    content = '''
+PRODUCT_DETAIL_TEMPLATE = compile_page('''
     <h2>{{ product.name }}</h2>
     <div class="product">
         <p><span class="label">类别:</span> {{ product.category }}</p>
@@ -197,17 +326,17 @@ def product_detail(id):
         <p><span class="label">上架时间:</span> {{ product.created_at }}</p>
     </div>
     <a href="/products">返回产品列表</a>
-    '''
-    return render_page(content, product=product)
+''')
 
-@app.route('/news')
-def news_list():
-    page = request.args.get('page', 1, type=int)
-    per_page = 5
-    total_pages = (len(db.news) + per_page - 1) // per_page
-    paginated_news = db.news[(page-1)*per_page : page*per_page]
+@app.route('/product/<int:id>')
+def product_detail(id):
+    product = db.products.get(id)
+    if not product:
+        return "产品不存在", 404
     
-    content = '''
+    return render_page(PRODUCT_DETAIL_TEMPLATE, product=product)
+
+NEWS_LIST_TEMPLATE = compile_page('''
     <h2>新闻中心</h2>
     {% for n in news %}
     <div class="news-item">
@@ -221,42 +350,51 @@ def news_list():
     
     <div class="pagination">
         {% if page > 1 %}
-            <a href="/news?page={{ page-1 }}">上一页</a>
+            <a href="/news?page={{ page-1 }}{{ filter_query }}">上一页</a>
         {% endif %}
         第 {{ page }} 页/共 {{ total_pages }} 页
         {% if page < total_pages %}
-            <a href="/news?page={{ page+1 }}">下一页</a>
+            <a href="/news?page={{ page+1 }}{{ filter_query }}">下一页</a>
         {% endif %}
     </div>
-    '''
-    return render_page(content, 
+''')
+
+@app.route('/news')
+def news_list():
+    page = request.args.get('page', 1, type=int)
+    per_page = 5
+    news, filter_query = filtered(db.news, 'author')
+    total_pages = (len(news) + per_page - 1) // per_page
+    paginated_news = news[(page-1)*per_page : page*per_page]
+    
+    return render_page(NEWS_LIST_TEMPLATE, 
                      news=paginated_news, 
                      page=page, 
-                     total_pages=total_pages)
+                     total_pages=total_pages,
+                     filter_query=filter_query)
 
-@app.route('/news/<int:id>')
-def news_detail(id):
-    news_item = next((n for n in db.news if n['id'] == id), None)
-    if not news_item:
-        return "新闻不存在", 404
-    
-    content = '''
+NEWS_DETAIL_TEMPLATE = compile_page('''
     <h2>{{ news_item.title }}</h2>
     <div class="news-item">
         <p><span class="label">发布日期:</span> {{ news_item.publish_date }}</p>
         <p><span class="label">作者:</span> {{ news_item.author }}</p>
         <p><span class="label">浏览量:</span> {{ news_item.views }}</p>
         <div style="margin-top: 20px; line-height: 1.6;">
-            {{ news_item.content | replace('\n', '<br>') }}
+            {{ news_item.content | replace('\n', '<br>'|safe) }}
         </div>
     </div>
     <a href="/news">返回新闻列表</a>
-    '''
-    return render_page(content, news_item=news_item)
+''')
 
-@app.route('/users')
-def user_list():
-    content = '''
+@app.route('/news/<int:id>')
+def news_detail(id):
+    news_item = db.news.get(id)
+    if not news_item:
+        return "新闻不存在", 404
+    
+    return render_page(NEWS_DETAIL_TEMPLATE, news_item=news_item)
+
+USER_LIST_TEMPLATE = compile_page('''
     <h2>用户管理</h2>
     <table style="width: 100%; border-collapse: collapse;">
         <thead>
@@ -282,16 +420,14 @@ def user_list():
             {% endfor %}
         </tbody>
     </table>
-    '''
-    return render_page(content, users=db.users)
+''')
 
-@app.route('/user/<int:id>')
-def user_detail(id):
-    user = next((u for u in db.users if u['id'] == id), None)
-    if not user:
-        return "用户不存在", 404
-    
-    content = '''
+@app.route('/users')
+def user_list():
+    users, _ = filtered(db.users, 'department')
+    return render_page(USER_LIST_TEMPLATE, users=users)
+
+USER_DETAIL_TEMPLATE = compile_page('''
     <h2>用户详情</h2>
     <div class="user-card">
         <p><span class="label">ID:</span> {{ user.id }}</p>
@@ -305,8 +441,58 @@ def user_detail(id):
         <p><span class="label">最后登录:</span> {{ user.last_login }}</p>
     </div>
     <a href="/users">返回用户列表</a>
-    '''
-    return render_page(content, user=user)
+''')
+
+@app.route('/user/<int:id>')
+def user_detail(id):
+    user = db.users.get(id)
+    if not user:
+        return "用户不存在", 404
+    
+    return render_page(USER_DETAIL_TEMPLATE, user=user)
+
+# JSON 接口: /api/products, /api/news, /api/users
+#   ?limit=N          每页条数 (默认 100, 最多 1000)
+#   ?cursor=ID        游标: 返回 id 大于它的记录, 取上一页响应中的 next_cursor
+#   ?category= / ?author= / ?department=   与列表页相同的筛选
+#   ?ids=1,2,3        批量按 id 取完整记录 (详情页数据)
+API_DEFAULT_LIMIT = 100
+API_MAX_LIMIT = 1000
+API_FILTERS = {"products": "category", "news": "author", "users": "department"}
+# 用户列表和 HTML 列表页一样只给出这些字段, 邮箱等详情字段需要通过 ids= 获取
+USER_LIST_FIELDS = ("id", "username", "name", "role", "department", "register_date")
+
+@app.route('/api/<table>')
+def api_list(table):
+    if table not in API_FILTERS:
+        return jsonify(error=f"未知的数据表: {table}"), 404
+    records = getattr(db, table)
+    
+    ids = request.args.get('ids')
+    if ids is not None:
+        try:
+            id_list = [int(i) for i in ids.split(',') if i.strip()]
+        except ValueError:
+            return jsonify(error="ids 必须是逗号分隔的整数"), 400
+        if len(id_list) > API_MAX_LIMIT:
+            return jsonify(error=f"ids 最多 {API_MAX_LIMIT} 个"), 400
+        items = [r for r in map(records.get, id_list) if r is not None]
+        return jsonify(items=items)
+    
+    limit = min(max(request.args.get('limit', API_DEFAULT_LIMIT, type=int), 1), API_MAX_LIMIT)
+    cursor = request.args.get('cursor', 0, type=int)
+    field = API_FILTERS[table]
+    value = request.args.get(field)
+    where = (field, value) if value else None
+    # 多取一条判断是否还有下一页
+    items = records.after(cursor, limit + 1, where)
+    next_cursor = items[limit - 1]["id"] if len(items) > limit else None
+    items = items[:limit]
+    if table == "users":
+        items = [{key: user[key] for key in USER_LIST_FIELDS} for user in items]
+    total = len(records.filter(*where) if where else records)
+    return jsonify(items=items, next_cursor=next_cursor, total=total)
 
 if __name__ == '__main__':
+    # 开发服务器 (单进程, 带调试器); 压测请用多进程的 serve.py
     app.run(host='0.0.0.0', port=5000, debug=True)
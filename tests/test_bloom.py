@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from crawl.bloom import BloomFilter, ScalableBloomFilter
+
+
+def test_sizing_follows_optimal_formulas():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    # m = -n ln p / (ln 2)^2 ≈ 9585.06, k = m / n * ln 2 ≈ 6.64
+    assert bloom.num_bits == 9586
+    assert bloom.num_hashes == 7
+    assert len(bloom.bits) == math.ceil(9586 / 8)
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=0)
+    with pytest.raises(ValueError):
+        BloomFilter(error_rate=1)
+
+
+def test_false_positive_rate_stays_near_target():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"http://example.com/item/{i}")
+    assert all(f"http://example.com/item/{i}" in bloom for i in range(2000))
+    false_positives = sum(f"http://example.com/other/{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert len(bloom) <= 2000
+
+
+def test_scalable_filter_grows_and_keeps_total_error_rate():
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=1e-6)
+    for i in range(700):
+        assert bloom.add(f"key{i}") is False
+    assert bloom.add("key3") is True
+    assert [f.capacity for f in bloom.filters] == [100, 200, 400]
+    assert sum(f.error_rate for f in bloom.filters) < 1e-6
+    assert all(f"key{i}" in bloom for i in range(700))
+    assert len(bloom) <= 700
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    bloom = ScalableBloomFilter(initial_capacity=50, error_rate=0.001)
+    for i in range(120):
+        bloom.add(f"http://example.com/{i}")
+    bloom.save(path)
+    loaded = ScalableBloomFilter.load(path)
+    assert loaded.error_rate == pytest.approx(0.001)
+    assert len(loaded) == len(bloom)
+    assert [(f.capacity, f.num_bits, f.num_hashes, f.bits) for f in loaded.filters] == [
+        (f.capacity, f.num_bits, f.num_hashes, f.bits) for f in bloom.filters]
+    assert all(f"http://example.com/{i}" in loaded for i in range(120))
+    # 载入后继续使用
+    assert loaded.add("http://example.com/new") is False
+    # 多级过滤器的文件不能当作单个 BloomFilter 载入
+    with pytest.raises(ValueError):
+        BloomFilter.load(path)
+
+
+def test_single_filter_round_trip_and_bad_file(tmp_path):
+    path = str(tmp_path / "one.bloom")
+    bloom = BloomFilter(capacity=10, error_rate=0.01)
+    bloom.add("a")
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+    assert "a" in loaded and len(loaded) == 1
+    bad = tmp_path / "bad.bloom"
+    bad.write_bytes(b"not a bloom filter")
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.load(str(bad))
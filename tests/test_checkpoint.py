@@ -0,0 +1,89 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from crawl.checkpoint import Checkpoint
+from crawl.pagination import PageFetchError, iter_pages
+
+BASE_URL = "http://example.com"
+TOTAL = 4
+
+
+def page(n):
+    return f"{BASE_URL}/products?page={n}"
+
+
+def test_replay_follows_planned_order_not_completion_order(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "cp.db"))
+    checkpoint.plan("/products", [page(1), page(2), page(3)])
+    checkpoint.complete("/products", page(3), [{"id": 5}, {"id": 6}])
+    checkpoint.complete("/products", page(1), [{"id": 1}, {"id": 2}])
+    assert list(checkpoint.replay("/products")) == [[{"id": 1}, {"id": 2}], [{"id": 5}, {"id": 6}]]
+    assert checkpoint.next_pending("/products") == page(2)
+    # 没有规划过的页面排在最后; 重复完成同一页时替换原来的记录
+    checkpoint.complete("/products", page(9), [{"id": 9}])
+    checkpoint.complete("/products", page(2), [{"id": 3}])
+    checkpoint.complete("/products", page(2), [{"id": 3}, {"id": 4}])
+    assert [r["id"] for records in checkpoint.replay("/products") for r in records] == [
+        1, 2, 3, 4, 5, 6, 9]
+
+
+def crawl(checkpoint, fail=(), fetched=None):
+    """像 core 一样: iter_pages 每产出一页就记入检查点, 返回产出的记录"""
+    async def fetch(url):
+        if url in fail:
+            raise RuntimeError("boom")
+        if fetched is not None:
+            fetched.append(url)
+        n = int(url.rsplit("=", 1)[1])
+        return SimpleNamespace(text=f"{n}|第 {n} 页/共 {TOTAL} 页")
+
+    async def parse(html):
+        n = int(html.split("|")[0])
+        return [{"id": n * 10 + i} for i in range(2)]
+
+    async def run():
+        records = []
+        async for url, page_data in iter_pages(fetch, BASE_URL, "/products",
+                                               checkpoint=checkpoint, parse=parse):
+            checkpoint.complete("/products", url, page_data)
+            records.extend(page_data)
+        return records
+
+    return asyncio.run(run())
+
+
+def test_resume_replays_done_pages_and_fetches_only_the_rest(tmp_path):
+    path = str(tmp_path / "cp.db")
+    checkpoint = Checkpoint(path)
+    with pytest.raises(PageFetchError) as error:
+        crawl(checkpoint, fail={page(3)})
+    assert error.value.urls == [page(3)]
+    checkpoint.close(success=False)
+    assert os.path.exists(path)
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.resumed
+    replayed = [r["id"] for records in checkpoint.replay("/products") for r in records]
+    assert replayed == [10, 11, 20, 21, 40, 41]
+    fetched = []
+    resumed = [r["id"] for r in crawl(checkpoint, fetched=fetched)]
+    assert fetched == [page(3)]
+    assert resumed == [30, 31]
+    assert sorted(replayed + resumed) == [10, 11, 20, 21, 30, 31, 40, 41]
+    # 全部完成后按规划顺序重放, 关闭时删除检查点文件
+    assert [r["id"] for records in checkpoint.replay("/products") for r in records] == [
+        10, 11, 20, 21, 30, 31, 40, 41]
+    checkpoint.close()
+    assert not os.path.exists(path)
+
+
+def test_checkpoint_with_pending_pages_is_kept(tmp_path):
+    path = str(tmp_path / "cp.db")
+    checkpoint = Checkpoint(path)
+    checkpoint.plan("/news", [page(1), page(2)])
+    checkpoint.complete("/news", page(1), [])
+    checkpoint.close()
+    assert os.path.exists(path)
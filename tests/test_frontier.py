@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from crawl.frontier import Frontier, canonicalize_url, fetch_details
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTP://Example.COM:80/a/./b/../c#top", "http://example.com/a/c"),
+    ("https://example.com:443", "https://example.com/"),
+    ("http://example.com:8080/%7euser/%e4%bd%a0", "http://example.com:8080/~user/%E4%BD%A0"),
+    ("http://example.com/路径", "http://example.com/%E8%B7%AF%E5%BE%84"),
+    ("http://example.com/a/..", "http://example.com/"),
+    ("http://example.com/a/b/.", "http://example.com/a/b/"),
+    ("http://user@example.com./x", "http://user@example.com/x"),
+    ("http://[::1]:80/", "http://[::1]/"),
+])
+def test_canonicalize_scheme_host_and_path(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url, expected", [
+    # 只按参数名排序, 同名参数保持原来的顺序
+    ("http://e.com/?b=2&a=1&b=1", "http://e.com/?a=1&b=2&b=1"),
+    # 没有 "=" 的参数保持原样, 空值参数保留 "="
+    ("http://e.com/?flag&x=", "http://e.com/?flag&x="),
+    ("http://e.com/?z&&a=1&", "http://e.com/?a=1&z"),
+    # "+" 与 %2B 含义不同, 不互相转换; 不需要编码的字符解码
+    ("http://e.com/?q=a+b&r=%2b&s=%7E", "http://e.com/?q=a+b&r=%2B&s=~"),
+    ("http://e.com/?", "http://e.com/"),
+])
+def test_canonicalize_query(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_equivalent_urls_share_a_key():
+    assert canonicalize_url("http://E.com/p?page=2&sort=new") == \
+        canonicalize_url("http://e.com:80/./p?sort=new&page=2#list")
+
+
+def test_frontier_dedupes_on_canonical_url_but_hands_over_the_original():
+    handled = []
+
+    async def handler(url, data):
+        handled.append(url)
+        return {"detail": url}
+
+    async def run():
+        async with Frontier(handler, workers=2, seen=set()) as frontier:
+            records = [{"link": "http://E.com/p?b=1&a=2"}, {"link": "http://e.com/p?a=2&b=1"},
+                       {"link": None}]
+            return await fetch_details(frontier, records, "link", fields=("detail",))
+
+    records = asyncio.run(run())
+    assert handled == ["http://E.com/p?b=1&a=2"]
+    assert records[0]["detail"] == "http://E.com/p?b=1&a=2"
+    # 重复和没有链接的记录也有详情字段
+    assert records[1]["detail"] is None and records[2]["detail"] is None
+
+
+def test_queued_and_seen_counts():
+    release = asyncio.Event()
+
+    async def handler(url, data):
+        await release.wait()
+
+    async def run():
+        async with Frontier(handler, workers=1) as frontier:
+            futures = [frontier.add(f"http://e.com/{n}") for n in (1, 2, 3)]
+            frontier.add("http://E.com/1")
+            await asyncio.sleep(0)  # 工作协程取走第一个链接
+            counts = frontier.queued, frontier.seen_count
+            release.set()
+            await asyncio.gather(*futures)
+            return counts, (frontier.queued, frontier.seen_count)
+
+    assert asyncio.run(run()) == ((2, 3), (0, 3))
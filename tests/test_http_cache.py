@@ -0,0 +1,67 @@
+import os
+
+from crawl.http_cache import HttpCache
+
+VALIDATOR = {"ETag": '"v1"'}
+
+
+def url(n):
+    return f"http://example.com/page/{n}"
+
+
+def fill(cache, *pages):
+    for n in pages:
+        cache.store(url(n), None, VALIDATOR, "x" * 100)
+
+
+def cached(cache):
+    return [n for n in range(10) if cache.lookup(url(n)) is not None]
+
+
+def entry_size(tmp_path):
+    probe = HttpCache(str(tmp_path / "probe"))
+    fill(probe, 0)
+    return probe._size
+
+
+def test_least_recently_used_entry_is_evicted_first(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache"), max_bytes=3 * entry_size(tmp_path))
+    fill(cache, 1, 2, 3)
+    assert cache.lookup(url(1))["text"] == "x" * 100  # 访问后 1 变成最新的
+    fill(cache, 4)
+    assert cached(cache) == [1, 3, 4]
+    assert len(os.listdir(tmp_path / "cache")) == 3
+
+
+def test_lru_order_is_restored_from_file_mtimes(tmp_path):
+    directory = tmp_path / "cache"
+    cache = HttpCache(str(directory), max_bytes=3 * entry_size(tmp_path))
+    fill(cache, 1, 2, 3)
+    # 模拟上次运行的访问顺序: 2 最旧, 1 最新
+    for n, mtime in ((2, 1000), (3, 2000), (1, 3000)):
+        os.utime(cache._path(cache.key(url(n))), (mtime, mtime))
+    reopened = HttpCache(str(directory), max_bytes=cache.max_bytes)
+    fill(reopened, 4)
+    assert sorted(reopened._entries) == sorted(cache.key(url(n)) for n in (1, 3, 4))
+
+
+def test_entry_larger_than_limit_is_kept_alone(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache"), max_bytes=10)
+    fill(cache, 1, 2)
+    assert cached(cache) == [2]
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache"))
+    cache.store(url(1), None, {"Content-Type": "text/html"}, "body")
+    assert cache.lookup(url(1)) is None
+    assert cache._size == 0
+
+
+def test_vary_headers_are_part_of_the_key(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache"))
+    cache.store(url(1), {"Accept-Language": "zh"}, VALIDATOR, "中文")
+    assert cache.lookup(url(1), {"accept-language": "zh"})["text"] == "中文"
+    assert cache.lookup(url(1), {"Accept-Language": "en"}) is None
+    assert cache.conditional_headers(cache.lookup(url(1), {"Accept-Language": "zh"})) == {
+        "If-None-Match": '"v1"'}
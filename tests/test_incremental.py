@@ -0,0 +1,36 @@
+from crawl.incremental import IncrementalStore
+
+
+def crawl(store, pages):
+    """像 save_stream 一样逐页 observe, 最后 finish 并保存"""
+    store.begin("products")
+    for records in pages:
+        store.observe("products", records, "link", exclude=("description",))
+    delta = store.finish("products")
+    store.save()
+    return delta
+
+
+def test_delta_against_previous_run_and_detail_reuse(tmp_path):
+    path = str(tmp_path / "state.json")
+    first = [[{"link": "/p/1", "price": 1, "description": "a"}],
+             [{"link": "/p/2", "price": 2, "description": "b"}]]
+    delta = crawl(IncrementalStore(path), first)
+    assert [r["link"] for r in delta["added"]] == ["/p/1", "/p/2"]
+
+    store = IncrementalStore(path)
+    unchanged = {"link": "/p/1", "price": 1}
+    changed = {"link": "/p/2", "price": 3}
+    # 列表内容没变的条目沿用上次的详情字段, 变了的要重新抓
+    assert store.reuse("products", "/p/1", unchanged, ("description",), exclude=("description",))
+    assert unchanged["description"] == "a"
+    assert not store.reuse("products", "/p/2", changed, ("description",), exclude=("description",))
+    added = {"link": "/p/3", "price": 4, "description": "c"}
+    delta = crawl(store, [[unchanged, {**changed, "description": "b2"}], [added]])
+    assert delta["added"] == [added]
+    assert [r["link"] for r in delta["changed"]] == ["/p/2"]
+    assert delta["removed"] == []
+
+    delta = crawl(IncrementalStore(path), [[added]])
+    assert delta["added"] == [] and delta["changed"] == []
+    assert sorted(delta["removed"]) == ["/p/1", "/p/2"]
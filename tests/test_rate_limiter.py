@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from crawl import rate_limiter
+from crawl.rate_limiter import HostRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """代替 time.monotonic / asyncio.sleep: sleep 只把时钟往前拨, 并记下等了多久"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr(rate_limiter, "asyncio",
+                        SimpleNamespace(Lock=asyncio.Lock, sleep=clock.sleep))
+    return clock
+
+
+def test_refill_adds_rate_tokens_per_second_up_to_burst(clock):
+    bucket = TokenBucket(rate=2, burst=4)
+    bucket.tokens = 0.0
+    clock.now += 1.5
+    bucket._refill(clock.now)
+    assert bucket.tokens == pytest.approx(3.0)
+    clock.now += 10
+    bucket._refill(clock.now)
+    assert bucket.tokens == 4
+
+
+def test_burst_is_served_without_waiting_then_one_token_per_interval(clock):
+    bucket = TokenBucket(rate=4, burst=2)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    asyncio.run(take(2))
+    assert clock.sleeps == []
+    asyncio.run(take(3))
+    assert clock.sleeps == pytest.approx([0.25, 0.25, 0.25])
+    assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_pause_holds_tokens_until_deadline(clock):
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.pause(3)
+    start = clock.now
+    asyncio.run(bucket.acquire())
+    assert clock.now - start == pytest.approx(3.0)
+
+
+def test_throttle_halves_rate_and_fast_responses_raise_it(clock):
+    limiter = HostRateLimiter(rate=8, burst=1, max_rate=9)
+    url = "http://example.com/a"
+    limiter.record(url, 429, 0.1, retry_after="2")
+    bucket = limiter.bucket(url)
+    assert bucket.rate == 4
+    assert bucket.paused_until == pytest.approx(clock.now + 2)
+    limiter.record(url, 200, 0.1)
+    assert bucket.rate == 5
+    # 其他主机不受影响
+    assert limiter.bucket("http://other.example.com/").rate == 8
+
+
+def test_rate_below_one_still_hands_out_tokens(clock):
+    # rate < 1 时 burst 至少为 1, 否则桶里永远攒不满一个令牌
+    bucket = TokenBucket(rate=0.5, burst=1)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    asyncio.run(take(2))
+    assert clock.sleeps == pytest.approx([2.0])
+
+
+@pytest.mark.parametrize("rate, burst", [(0.5, 0), (0, 1), (-1, 1)])
+def test_invalid_rate_or_burst_is_rejected(rate, burst):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, burst)
+    with pytest.raises(ValueError):
+        HostRateLimiter(rate=rate, burst=burst)
@@ -0,0 +1,35 @@
+import pytest
+
+import server_web
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server_web, "db", server_web.Database(products=30, news=5, users=5, seed=1))
+    monkeypatch.setattr(server_web, "page_cache", server_web.PageCache())
+    return server_web.app.test_client()
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "identity"])
+def test_304_repeats_the_validators_of_the_200(client, encoding):
+    first = client.get("/products?page=1", headers={"Accept-Encoding": encoding})
+    assert first.status_code == 200
+    assert first.headers["Last-Modified"]
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert (first.headers.get("Content-Encoding") == "gzip") == (encoding == "gzip")
+
+    again = client.get("/products?page=1", headers={"Accept-Encoding": encoding,
+                                                    "If-None-Match": etag})
+    assert again.status_code == 304
+    # RFC 9110: 304 重复 200 会带的 ETag 和 Vary
+    assert again.headers["ETag"] == etag
+    assert again.headers["Vary"] == first.headers["Vary"]
+
+
+def test_etag_changes_with_the_data(client):
+    etag = client.get("/products?page=1").headers["ETag"]
+    server_web.db.touch()
+    response = client.get("/products?page=1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag